@@ -10,7 +10,7 @@ from .database import  db
 from motor.motor_asyncio import AsyncIOMotorGridFSBucket
 import json
 import base64
-from openai import OpenAI
+from openai import AsyncOpenAI
 from .database import profiles_collection
 from google import genai
 from google.genai import types
@@ -43,7 +43,7 @@ async def get_all_images():
 
 async def create_brand_profile(images, openai_key):
     """Create a brand profile using OpenAI API and generate an image"""
-    client = OpenAI(api_key=openai_key)
+    client = AsyncOpenAI(api_key=openai_key)
     
     # Prepare images for GPT (convert to base64)
     image_contents = []
@@ -99,7 +99,7 @@ async def create_brand_profile(images, openai_key):
     ]
     
     try:
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-4o-mini",
             messages=messages,
             max_tokens=1500
@@ -1,11 +1,15 @@
+import asyncio
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 
-
+from app.core.config import settings
+from app.core.migrations import set_timeouts
+from app.models import Base
 
 
 # this is the Alembic Config object, which provides
@@ -17,46 +21,14 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-# add your model's MetaData object here
-# for 'autogenerate' support
-# from myapp import mymodel
-# target_metadata = mymodel.Base.metadata
-from app.models import Base
-target_metadata = Base.metadata
-
-# other values from the config, defined by the needs of env.py,
-# can be acquired:
-# my_important_option = config.get_main_option("my_important_option")
-# ... etc.
-
-
-# def do_run_migrations(connection: Connection) -> None:
-#     context.configure(connection=connection, target_metadata=target_metadata)
-
-#     with context.begin_transaction():
-#         context.run_migrations()
+# Same asyncpg URL as the app; '%' is escaped for configparser
+config.set_main_option(
+    "sqlalchemy.url",
+    (settings.DATABASE_MIGRATION_URL or settings.DATABASE_URL).replace("%", "%%"),
+)
 
+target_metadata = Base.metadata
 
-# async def run_async_migrations() -> None:
-#     """In this scenario we need to create an Engine
-#     and associate a connection with the context."""
-
-#     connectable = async_engine_from_config(
-#         config.get_section(config.config_ini_section, {}),
-#         prefix="sqlalchemy.",
-#         poolclass=pool.NullPool,
-#     )
-
-#     async with connectable.connect() as connection:
-#         await connection.run_sync(do_run_migrations)
-
-#     await connectable.dispose()
-
-
-# def run_migrations_online() -> None:
-#     """Run migrations in 'online' mode."""
-
-#     asyncio.run(run_async_migrations())
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -76,32 +48,51 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
+        set_timeouts()
         context.run_migrations()
-        
 
-def run_migrations_online() -> None:
-    """Run migrations in 'online' mode.
 
-    In this scenario we need to create an Engine
-    and associate a connection with the context.
+def do_run_migrations(connection: Connection) -> None:
+    # Session-level, so the timeouts also cover autocommit blocks
+    set_timeouts(connection)
+    connection.commit()
 
-    """
-    connectable = engine_from_config(
+    # One transaction per revision: a failure rolls back only that revision
+    # and locks are released between revisions
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        transaction_per_migration=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    """In this scenario we need to create an Engine
+    and associate a connection with the context."""
+
+    connectable = async_engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
 
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
+
+
+def run_migrations_online() -> None:
+    """Run migrations in 'online' mode."""
 
-        with context.begin_transaction():
-            context.run_migrations()
+    asyncio.run(run_async_migrations())
 
 
 if context.is_offline_mode():
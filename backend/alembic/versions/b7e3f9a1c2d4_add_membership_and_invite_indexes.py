@@ -0,0 +1,37 @@
+"""Add membership and invite indexes
+
+Revision ID: b7e3f9a1c2d4
+Revises: 8c1d2e4f6a10
+Create Date: 2026-10-18 14:37:09.581120
+
+"""
+from typing import Sequence, Union
+
+from app.core.migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3f9a1c2d4'
+down_revision: Union[str, None] = '8c1d2e4f6a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns); mirrored in app/models.py
+INDEXES = [
+    ('ix_organization_members_user_id', 'organization_members', ['user_id']),
+    ('ix_organization_members_organization_id_status', 'organization_members', ['organization_id', 'status']),
+    ('ix_organization_members_organization_id_created_at_id', 'organization_members', ['organization_id', 'created_at', 'id']),
+    ('ix_organization_invites_organization_id_email', 'organization_invites', ['organization_id', 'email']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        create_index_concurrently(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        drop_index_concurrently(name, table)
@@ -1,18 +1,27 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.deps import get_db
+from fastapi import APIRouter, Response
+from app.core.health import health_monitor
+from app.core.instrumentation import query_metrics
 
 router = APIRouter()
 
 @router.get("/health")
-async def health_check(db: AsyncSession = Depends(get_db)):
-    try:
-        # Test database connection
-        await db.execute("SELECT 1")
-        return {"status": "healthy", "database": "connected"}
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "database": "disconnected",
-            "error": str(e)
-        }
\ No newline at end of file
+async def health_check():
+    """Last background probe results plus live pool and executor stats"""
+    return health_monitor.snapshot()
+
+@router.get("/live")
+async def liveness():
+    # The process is up and the event loop is responsive
+    return {"status": "alive"}
+
+@router.get("/ready")
+async def readiness(response: Response):
+    if not health_monitor.ready:
+        response.status_code = 503
+        return {"status": "not ready", "checks": health_monitor.checks}
+    return {"status": "ready"}
+
+@router.get("/db-metrics")
+async def db_metrics():
+    """Per-endpoint query counts and DB time since this worker started"""
+    return query_metrics.snapshot()
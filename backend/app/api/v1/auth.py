@@ -1,10 +1,13 @@
 # app/api/v1/auth.py
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Response
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Header, Query, Response, status
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.deps import get_db, get_current_user
+from app.core.deps import get_db, get_read_db, get_current_user, get_storage
+from app.core.http_cache import REVALIDATE, etag_matches, weak_etag
 from app.services.auth import AuthService
-from app.schemas.auth import UserCreate, UserLogin, UserResponse, ForgotPasswordRequest, ResetPasswordRequest, UserUpdate, OrganizationCreate, OnboardingStatusResponse
-from app.models import User
+from app.schemas.auth import AcceptInviteRequest, AcceptInviteResponse, BulkInviteCreate, BulkInviteResponse, BulkUserCreate, BulkUserResponse, CurrentUser, MemberListResponse, UserCreate, UserLogin, UserResponse, ForgotPasswordRequest, ResetPasswordRequest, UserUpdate, OrganizationCreate, OnboardingStatusResponse
+from app.models import MemberRole, MemberStatus
 from app.services.storage import StorageService
 
 
@@ -34,6 +37,24 @@ async def register(
     except Exception as e: # Catch unexpected errors
         print(f"Unexpected registration error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error during registration.")
+
+@router.post("/users/bulk", response_model=BulkUserResponse)
+async def bulk_register(
+    bulk_data: BulkUserCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        auth_service = AuthService(db)
+        admin = await auth_service._require_admin(current_user.id)
+        return await auth_service.bulk_register_users(admin.organization_id, bulk_data.users)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SQLAlchemyError as e:
+        print(f"Database error during bulk registration: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again.")
     
 # @router.patch("/users/me", response_model=UserResponse)
 # async def update_user(
@@ -48,26 +69,40 @@ async def register(
 #     except ValueError as e:
 #         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/users/me", response_model=CurrentUser)
+async def get_me(
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
+):
+    # The authenticated user snapshot is already loaded (usually from cache),
+    # so both the ETag and the body cost no extra query
+    etag = weak_etag("user", current_user.id, current_user.updated_at)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": REVALIDATE})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE
+    return current_user
+
 @router.patch("/users/me", response_model=UserResponse) # Or a more specific UserDetailResponse
 async def update_user(
     user_data: UserUpdate, # Use the UserUpdate schema
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     try:
         auth_service = AuthService(db)
         # Pass the Pydantic model directly
         updated_user = await auth_service.update_user(current_user.id, user_data)
-        # Map the updated User model back to a response schema if necessary
-        # This might require fetching the latest org status again or having update_user return it
-        # For simplicity now, just return basic user info - adjust as needed
+        # Re-check org status; the service memoizes the lookup for this request
+        membership = await auth_service._get_user_membership(updated_user.id)
         return UserResponse(
              id=updated_user.id,
              email=updated_user.email,
              full_name=updated_user.full_name,
-             has_existing_org= bool(await auth_service._get_user_membership(updated_user.id)), # Re-check org status
+             has_existing_org=bool(membership),
              domain=updated_user.email.split('@')[1],
-             organization_status=(await auth_service._get_user_membership(updated_user.id)).status if await auth_service._get_user_membership(updated_user.id) else None
+             organization_status=membership.status if membership else None
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -127,7 +162,7 @@ async def reset_password(
 @router.get("/verify")
 async def verify_email(
     token: str,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     try:
@@ -147,16 +182,16 @@ async def create_organization(
     domain: str = Form(...),
     workspace_url: str = Form(...),
     logo: UploadFile = File(None),
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    storage_service: StorageService = Depends(get_storage)
 ):
     try:
                 # Debug: Print received data
         print(f"Received form data: name={name}, domain={domain}, workspace_url={workspace_url}")
-        storage_service = StorageService()
       
         try:
-            logo_url = await storage_service.upload_file(logo, "organization-logos")
+            uploaded = await storage_service.upload_image(logo, "organization-logos") if logo else {}
         except Exception as upload_error:
             print(f"Logo upload error details: {str(upload_error)}")
             raise HTTPException(
@@ -168,7 +203,8 @@ async def create_organization(
             name=name,
             domain=domain,
             workspace_url=workspace_url,
-            logo_url=logo_url
+            logo_url=uploaded.get("url"),
+            logo_variants=uploaded.get("variants")
         )
         
         auth_service = AuthService(db)
@@ -179,15 +215,79 @@ async def create_organization(
     
 @router.get("/onboarding-status", response_model=OnboardingStatusResponse)
 async def get_onboarding_status(
-    current_user: User = Depends(get_current_user), # Protected route
-    db: AsyncSession = Depends(get_db)
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user), # Protected route
+    db: AsyncSession = Depends(get_read_db),
+    if_none_match: Optional[str] = Header(None)
 ):
     try:
         auth_service = AuthService(db)
+        # Pollers usually have the current version; answer them from one cheap query
+        version = await auth_service.get_onboarding_version(current_user.id)
+        if version is None:
+            raise ValueError("User not found")
+        etag = weak_etag("onboarding", current_user.id, *version)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": REVALIDATE})
         status = await auth_service.get_onboarding_status(current_user.id)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = REVALIDATE
         return status
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e)) # 404 if user not found by service
     except Exception as e: # Catch unexpected errors
         print(f"Unexpected onboarding status error: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error fetching onboarding status.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error fetching onboarding status.")
+
+@router.post("/organization/invites", response_model=BulkInviteResponse)
+async def bulk_invite(
+    invite_data: BulkInviteCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        auth_service = AuthService(db)
+        admin = await auth_service._require_admin(current_user.id)
+        return await auth_service.bulk_create_invites(
+            admin.organization_id,
+            invite_data.emails,
+            invite_data.role,
+            invite_data.expires_in_days
+        )
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except SQLAlchemyError as e:
+        print(f"Database error during bulk invite: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again.")
+
+@router.post("/invites/accept", response_model=AcceptInviteResponse)
+async def accept_invite(
+    request: AcceptInviteRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        auth_service = AuthService(db)
+        return await auth_service.accept_invite(current_user.id, current_user.email, request.token)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/organization/members", response_model=MemberListResponse)
+async def list_members(
+    status: Optional[MemberStatus] = None,
+    role: Optional[MemberRole] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    try:
+        auth_service = AuthService(db)
+        member = await auth_service._get_user_membership(current_user.id)
+        if not member or member.status != MemberStatus.active:
+            raise PermissionError("Only active organization members can list members")
+        return await auth_service.list_members(member.organization_id, status, role, limit, cursor)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,98 @@
+# app/api/v1/uploads.py
+import os
+from uuid import uuid4
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.deps import get_db, get_read_db, get_current_user, get_storage
+from app.services.auth import AuthService
+from app.services.storage import StorageService, UnsupportedOperation
+from app.schemas.auth import CurrentUser
+from app.schemas.uploads import ConfirmUploadRequest, ConfirmUploadResponse, PresignUploadRequest, PresignUploadResponse
+
+
+router = APIRouter()
+
+FOLDERS = {
+    "organization_logo": "organization-logos",
+    "user_image": "user-images",
+}
+
+
+def _upload_prefix(target: str, user_id) -> str:
+    # Keys are scoped to the uploader so confirm can't claim someone else's object
+    return f"{FOLDERS[target]}/{user_id}/"
+
+
+@router.post("/presign", response_model=PresignUploadResponse)
+async def presign_upload(
+    upload: PresignUploadRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    storage_service: StorageService = Depends(get_storage)
+):
+    """Issue a presigned POST so the browser uploads straight to the bucket"""
+    if upload.content_type not in settings.STORAGE_IMAGE_TYPES:
+        raise HTTPException(status_code=415, detail=f"Unsupported content type {upload.content_type}")
+    if upload.content_length > settings.STORAGE_MAX_IMAGE_SIZE:
+        raise HTTPException(status_code=413, detail="File is too large")
+    try:
+        if upload.target == "organization_logo":
+            await AuthService(db)._require_admin(current_user.id)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
+    filename = os.path.basename(upload.filename).replace(" ", "-") or "upload"
+    key = f"{_upload_prefix(upload.target, current_user.id)}{uuid4()}-{filename}"
+    try:
+        post = storage_service.presign_upload(key, upload.content_type, settings.STORAGE_MAX_IMAGE_SIZE)
+    except UnsupportedOperation as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return {
+        "url": post["url"],
+        "fields": post["fields"],
+        "key": key,
+        "expires_in": settings.STORAGE_PRESIGN_EXPIRES,
+    }
+
+
+@router.post("/confirm", response_model=ConfirmUploadResponse)
+async def confirm_upload(
+    upload: ConfirmUploadRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    storage_service: StorageService = Depends(get_storage)
+):
+    """Check the uploaded object and record its URL on the user or organization"""
+    if not upload.key.startswith(_upload_prefix(upload.target, current_user.id)):
+        raise HTTPException(status_code=403, detail="Upload does not belong to this user")
+    auth_service = AuthService(db)
+    try:
+        # Before any storage or image work
+        if upload.target == "organization_logo":
+            member = await auth_service._require_admin(current_user.id)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
+    obj = await storage_service.head(upload.key)
+    if obj is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if obj["size"] > settings.STORAGE_MAX_IMAGE_SIZE:
+        raise HTTPException(status_code=413, detail="File is too large")
+    if obj["content_type"] not in settings.STORAGE_IMAGE_TYPES:
+        raise HTTPException(status_code=415, detail=f"Unsupported content type {obj['content_type']}")
+
+    url = storage_service.public_url(upload.key)
+    variants = await storage_service.create_variants(upload.key, obj["content_type"])
+    try:
+        if upload.target == "organization_logo":
+            await auth_service.update_organization_logo(member.organization_id, url, variants)
+        else:
+            await auth_service.update_user_image(current_user.id, url, variants)
+        return {"url": url, "variants": variants}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except SQLAlchemyError as e:
+        print(f"Database error confirming upload: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again.")
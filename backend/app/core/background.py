@@ -0,0 +1,26 @@
+# app/core/background.py
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class BackgroundWorker(ABC):
+    """Base for worker singletons that run `_run` as a task between app startup and shutdown"""
+
+    _task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @abstractmethod
+    async def _run(self):
+        """The worker's loop; runs until cancelled"""
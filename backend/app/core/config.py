@@ -1,13 +1,93 @@
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    DATABASE_REPLICA_URLS: List[str] = []  # JSON list, e.g. '["postgresql+asyncpg://..."]'
+    # Keep a user's reads on the primary this long after they write
+    READ_YOUR_WRITES_SECONDS: int = 5
+
+    # "direct" for a plain Postgres connection, "pgbouncer" when DATABASE_URL
+    # points at PgBouncer in transaction mode (no statement caching, no pre-ping)
+    DATABASE_POOL_MODE: str = "direct"
+    DATABASE_POOL_SIZE: int = 20  # 0 with pgbouncer mode uses NullPool
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100  # Prepared statements cached per connection (direct mode)
+    DATABASE_LIVENESS_INTERVAL: int = 30  # Seconds between background pool probes (pgbouncer mode)
+    # Direct (non-PgBouncer) URL for LISTEN/NOTIFY; LISTEN doesn't survive transaction pooling
+    DATABASE_LISTEN_URL: Optional[str] = None
+    # Direct URL for migrations (session SETs and CONCURRENTLY); defaults to DATABASE_URL
+    DATABASE_MIGRATION_URL: Optional[str] = None
+    # Postgres interval strings applied to every migration. A DDL statement
+    # waiting on a lock blocks all queries queued behind it, so give up fast
+    MIGRATION_LOCK_TIMEOUT: str = "5s"
+    MIGRATION_STATEMENT_TIMEOUT: str = "5min"
+
+    # Seconds between background health probes of Postgres, Supabase and storage
+    HEALTH_CHECK_INTERVAL: int = 10
+
+    # Shared S3 client; keep max pool connections >= BLOCKING_IO_WORKERS
+    STORAGE_MAX_POOL_CONNECTIONS: int = 32
+    STORAGE_CONNECT_TIMEOUT: int = 5
+    STORAGE_READ_TIMEOUT: int = 60
+    # Uploads larger than one part use S3 multipart (parts must be >= 5 MiB)
+    STORAGE_PART_SIZE: int = 8 * 1024 * 1024
+    STORAGE_UPLOAD_CONCURRENCY: int = 4
+    STORAGE_MAX_UPLOAD_SIZE: int = 100 * 1024 * 1024
+
+    # Direct-to-bucket image uploads (logos, avatars). Uploads through the API
+    # accept only the raster types among these, checked against the bytes
+    STORAGE_PRESIGN_EXPIRES: int = 600
+    STORAGE_MAX_IMAGE_SIZE: int = 10 * 1024 * 1024
+    STORAGE_IMAGE_TYPES: List[str] = ["image/png", "image/jpeg", "image/webp", "image/gif", "image/svg+xml"]
+
+    # Resized copies generated at upload time (longest side, in px)
+    IMAGE_VARIANT_SIZES: List[int] = [32, 64, 128, 256]
+    IMAGE_VARIANT_FORMATS: List[str] = ["webp", "avif"]
+    CPU_WORKERS: int = 2
+
     SUPABASE_URL: str
     SUPABASE_KEY: str
-    DO_SPACE_REGION: str
-    DO_SPACE_KEY: str
-    DO_SPACE_SECRET: str
-    DO_SPACE_BUCKET: str
+
+    # "s3" for Spaces or any S3-compatible store (MinIO), "local" for files on disk
+    STORAGE_BACKEND: str = "s3"
+    DO_SPACE_REGION: Optional[str] = None
+    DO_SPACE_KEY: Optional[str] = None
+    DO_SPACE_SECRET: Optional[str] = None
+    DO_SPACE_BUCKET: Optional[str] = None
+    # Non-Spaces S3 endpoint, e.g. http://localhost:9000 for MinIO (path-style)
+    STORAGE_ENDPOINT_URL: Optional[str] = None
+    # Base of public object URLs; defaults to the bucket URL, or LOCAL_STORAGE_URL_PATH
+    STORAGE_PUBLIC_URL: Optional[str] = None
+    LOCAL_STORAGE_PATH: str = "media"
+    LOCAL_STORAGE_URL_PATH: str = "/media"  # Served by the API when STORAGE_BACKEND=local
+
+    # Token verification: "local" checks JWTs in-process, "strict" asks Supabase
+    # on every request so revoked sessions are rejected immediately
+    AUTH_VERIFY_MODE: str = "local"
+    SUPABASE_JWT_SECRET: Optional[str] = None  # Legacy HS256 projects
+    SUPABASE_JWT_AUDIENCE: str = "authenticated"
+    AUTH_JWKS_TTL_SECONDS: int = 600
+
+    # Threads used for blocking SDK calls (Supabase, boto3, OpenAI)
+    BLOCKING_IO_WORKERS: int = 16
+
+    # Per-worker cache of the authenticated user row
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_ENTRIES: int = 10000
+
+    # Full reload interval for the in-memory organization domain index
+    ORG_INDEX_REFRESH_SECONDS: int = 300
+
+    # Rows per multi-row INSERT in bulk endpoints
+    BULK_INSERT_BATCH_SIZE: int = 1000
+
+    ENVIRONMENT: str = "production"
+    # Per-request X-DB-* response headers; only honoured when ENVIRONMENT is "development"
+    SQL_STATS_HEADERS: bool = False
+    SQL_ECHO: bool = False
+    # Same statement shape this many times in one request is flagged as N+1
+    SQL_REPEAT_THRESHOLD: int = 3
 
     class Config:
         env_file = ".env"
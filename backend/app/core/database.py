@@ -1,23 +1,243 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+import asyncio
+import random
+import time
+from contextvars import ContextVar
+from typing import Optional
+from uuid import UUID, uuid4
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.sql.dml import UpdateBase
+from .background import BackgroundWorker
 from .config import settings
+from .instrumentation import instrument_engine, record_pool_wait
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout waits and connect times separately"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.connect_count = 0
+        self.connect_total = 0.0
+        self.connect_max = 0.0
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        record = super()._create_connection()
+        elapsed = time.perf_counter() - start
+        self.connect_count += 1
+        self.connect_total += elapsed
+        self.connect_max = max(self.connect_max, elapsed)
+        # Picked up by the _do_get that grew the pool; info is per DBAPI connection
+        record.info["connect_time"] = elapsed
+        return record
+
+    def _do_get(self):
+        start = time.perf_counter()
+        record = None
+        try:
+            record = super()._do_get()
+            return record
+        finally:
+            connect = record.info.pop("connect_time", 0.0) if record is not None else 0.0
+            elapsed = time.perf_counter() - start - connect
+            self.wait_count += 1
+            self.wait_total += elapsed
+            self.wait_max = max(self.wait_max, elapsed)
+            record_pool_wait(elapsed, connect)
+
+
+def pool_stats(target: AsyncEngine) -> dict:
+    pool = target.pool
+    if not isinstance(pool, TimedQueuePool):
+        return {"class": type(pool).__name__}
+    return {
+        "class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "checkouts": pool.wait_count,
+        "avg_wait_ms": round(pool.wait_total * 1000 / pool.wait_count, 3) if pool.wait_count else 0.0,
+        "max_wait_ms": round(pool.wait_max * 1000, 3),
+        "connects": pool.connect_count,
+        "avg_connect_ms": round(pool.connect_total * 1000 / pool.connect_count, 3) if pool.connect_count else 0.0,
+        "max_connect_ms": round(pool.connect_max * 1000, 3),
+    }
+
+
+def engine_options(mode: str, pool_size: Optional[int] = None) -> dict:
+    """create_async_engine arguments for a DATABASE_POOL_MODE"""
+    if pool_size is None:
+        pool_size = settings.DATABASE_POOL_SIZE
+    if mode == "pgbouncer":
+        # PgBouncer in transaction mode hands each transaction a different server
+        # connection, so prepared statements must not outlive a transaction:
+        # no statement caching, and unique names so two clients never collide.
+        options = {
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            },
+            # Liveness is checked in the background by PoolLivenessMonitor
+            "pool_pre_ping": False,
+        }
+        if pool_size == 0:
+            # PgBouncer already pools; don't hold connections on our side at all
+            options["poolclass"] = NullPool
+        else:
+            options.update(
+                poolclass=TimedQueuePool,
+                pool_size=pool_size,
+                max_overflow=settings.DATABASE_MAX_OVERFLOW,
+                pool_timeout=30,
+            )
+        return options
+    return {
+        "connect_args": {
+            "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        },
+        "poolclass": TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": 30,  # Timeout after 30 seconds
+        "pool_pre_ping": True,  # Enable connection health checks
+        "pool_recycle": 1800,  # Recycle connections after 30 minutes
+    }
+
+
+def create_engine_for(url: str, mode: str = settings.DATABASE_POOL_MODE, pool_size: Optional[int] = None) -> AsyncEngine:
+    engine = create_async_engine(url, echo=settings.SQL_ECHO, **engine_options(mode, pool_size))
+    instrument_engine(engine)
+    return engine
+
+
+engine = create_engine_for(settings.DATABASE_URL)
+replica_engines = [create_engine_for(url) for url in settings.DATABASE_REPLICA_URLS]
+
+
+class PoolLivenessMonitor(BackgroundWorker):
+    """Background replacement for pool_pre_ping in pgbouncer mode.
+
+    Instead of a round trip on every checkout, one connection per engine is
+    probed every `interval` seconds; if the probe fails the pool is disposed
+    so stale connections are replaced on their next checkout.
+    """
+
+    def __init__(self, engines: list[AsyncEngine], interval: int):
+        self.engines = engines
+        self.interval = interval
+
+    async def _probe(self, target: AsyncEngine):
+        try:
+            async with target.connect() as conn:
+                await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout=5)
+        except Exception as e:
+            print(f"Database liveness check failed for {target.url.host}: {e}")
+            await target.dispose()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await asyncio.gather(*(self._probe(target) for target in self.engines))
+
+
+pool_liveness_monitor = PoolLivenessMonitor([engine, *replica_engines], settings.DATABASE_LIVENESS_INTERVAL)
+
+# Same pools in autocommit: asyncpg sends no BEGIN, and so no COMMIT or
+# ROLLBACK on release either. Each statement gets its own snapshot. Writes
+# never use these (see RoutingSession)
+read_only_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+read_only_replica_engines = [e.execution_options(isolation_level="AUTOCOMMIT") for e in replica_engines]
+
+# Set by get_current_user so sessions can tell whose request they serve
+request_user_id: ContextVar[Optional[UUID]] = ContextVar("request_user_id", default=None)
+
+
+class PrimaryStickiness:
+    """Read-your-writes: after a user writes, their reads stay on the primary
+    for `window` seconds so replica lag can't hide their own changes.
+
+    Tracked per worker; other workers rely on replica lag staying below the window.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._until: dict[UUID, float] = {}
+
+    def mark(self, user_id: Optional[UUID]):
+        if user_id is None or not replica_engines:
+            return
+        now = time.monotonic()
+        if len(self._until) > 10000:
+            self._until = {uid: until for uid, until in self._until.items() if until > now}
+        self._until[user_id] = now + self.window
+
+    def active(self, user_id: Optional[UUID]) -> bool:
+        return user_id is not None and self._until.get(user_id, 0) > time.monotonic()
+
+
+primary_stickiness = PrimaryStickiness(settings.READ_YOUR_WRITES_SECONDS)
+
+
+class RoutingSession(Session):
+    """Sends read-only sessions to a replica and everything else to the primary.
+
+    A session is read-only when opened with info={"read_only": True} (see
+    deps.get_read_db); it runs in autocommit. Flushes and DML always
+    go to the primary, and one replica is picked per session so a transaction
+    never spans replicas.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            not self.info.get("read_only")
+            or self._flushing
+            or isinstance(clause, UpdateBase)
+        ):
+            return engine.sync_engine
+        if "read_bind" not in self.info:
+            if read_only_replica_engines and not primary_stickiness.active(request_user_id.get()):
+                self.info["read_bind"] = random.choice(read_only_replica_engines)
+            else:
+                self.info["read_bind"] = read_only_engine
+        return self.info["read_bind"].sync_engine
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _track_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _track_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _stick_after_write(session):
+    if session.info.pop("wrote", False):
+        primary_stickiness.mark(request_user_id.get())
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _reset_write_flag(session):
+    session.info.pop("wrote", None)
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,  # Set to False in production
-    pool_size=20,  # Increase pool size
-    max_overflow=10,  # Allow some overflow
-    pool_timeout=30,  # Timeout after 30 seconds
-    pool_pre_ping=True,  # Enable connection health checks
-    pool_recycle=1800,  # Recycle connections after 30 minutes
-)
 
 AsyncSessionLocal = sessionmaker(
-    bind=engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False
 )
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
@@ -2,40 +2,66 @@
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from .database import AsyncSessionLocal
-from app.core.supabase import supabase_client
+from .database import AsyncSessionLocal, request_user_id
+from .config import settings
+from .executor import run_blocking
+from .security import TokenUser, UnknownSigningKeyError, token_verifier, verify_remote
+from .singleflight import SingleFlight
+from .user_cache import current_user_cache
 from app.models import User
+from app.schemas.auth import CurrentUser
+from app.services.storage import StorageService, get_storage_service
 
 
 security = HTTPBearer()
 
+# Parallel requests from one page load carry the same token and user id;
+# only one of them goes upstream, the rest share its result
+token_flights = SingleFlight("verify_token")
+user_flights = SingleFlight("current_user")
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    # AsyncSession checks out a connection on first execute, so handlers that
+    # never touch the database never take a pool slot
     async with AsyncSessionLocal() as session:
         try:
             yield session
+            # COMMIT costs the same round trip as the ROLLBACK the pool would
+            # send instead; read-only handlers use get_read_db, which has neither
             await session.commit()
-        except SQLAlchemyError as e:
+        except Exception:
+            # Re-raise so handlers' HTTPExceptions still reach FastAPI
             await session.rollback()
             raise
-        except Exception as e:
-            await session.rollback()
         finally:
             await session.close()
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only handlers: autocommit, routed to a replica when one is configured"""
+    async with AsyncSessionLocal(info={"read_only": True}) as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+async def get_storage() -> StorageService:
+    return get_storage_service()
+
 async def verify_token(
     credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> dict:
+) -> TokenUser:
+    token = credentials.credentials
     try:
-
-        response = supabase_client.auth.get_user(credentials.credentials)
-    
-        if not response.user:
-            raise ValueError("No user found in token")
-        return response.user
+        if settings.AUTH_VERIFY_MODE == "strict":
+            return await token_flights.do(token, lambda: run_blocking(verify_remote, token))
+        try:
+            return token_verifier.decode(token)
+        except UnknownSigningKeyError:
+            # Key rotated or not cached yet - let Supabase decide
+            return await token_flights.do(token, lambda: run_blocking(verify_remote, token))
     except Exception as e:
         print(f"Token verification error: {e}")
         raise HTTPException(
@@ -44,19 +70,29 @@ async def verify_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-async def get_current_user(
-    user: dict = Depends(verify_token),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    try:
-                # The user.id from Supabase token should match our User.id
+async def _load_current_user(user: TokenUser) -> CurrentUser:
+    # Own session: this may run on behalf of several requests (see user_flights)
+    async with AsyncSessionLocal(info={"read_only": True}) as db:
+        # The user.id from Supabase token should match our User.id
         result = await db.execute(
             select(User).where(User.id == user.id)
         )
         db_user = result.scalar_one_or_none()
         if db_user is None:
             raise HTTPException(status_code=404, detail="User not found")
-        return db_user
+        snapshot = CurrentUser.model_validate(db_user)
+    current_user_cache.set(user.id, user.exp, snapshot)
+    return snapshot
+
+async def get_current_user(
+    user: TokenUser = Depends(verify_token)
+) -> CurrentUser:
+    request_user_id.set(user.id)
+    try:
+        cached = current_user_cache.get(user.id, user.exp)
+        if cached is not None:
+            return cached
+        return await user_flights.do(user.id, lambda: _load_current_user(user))
     except Exception as e:
         raise HTTPException(status_code=401, detail="Invalid authentication")
     
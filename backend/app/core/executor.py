@@ -0,0 +1,102 @@
+# app/core/executor.py
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, TypeVar
+
+from .config import settings
+
+T = TypeVar("T")
+
+
+class _TrackedExecutor:
+    """In-flight and completed call counts shared by the executors below"""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._in_flight = 0
+        self._completed = 0
+
+    async def _submit(self, pool, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        self._in_flight += 1
+        try:
+            return await loop.run_in_executor(pool, func, *args)
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "in_flight": self._in_flight,
+            # Calls waiting for a free worker
+            "queue_depth": max(0, self._in_flight - self.max_workers),
+            "completed": self._completed,
+        }
+
+
+class BlockingExecutor(_TrackedExecutor):
+    """Shared thread pool for sync SDK calls (Supabase, boto3, OpenAI).
+
+    Every blocking call goes through `run` so it never stalls the event loop,
+    and the number of threads - and therefore concurrent upstream calls - is
+    bounded by BLOCKING_IO_WORKERS.
+    """
+
+    def __init__(self, max_workers: int):
+        super().__init__(max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="genie-io")
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await self._submit(self._pool, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class CpuExecutor(_TrackedExecutor):
+    """Process pool for CPU-bound work (image decoding and encoding).
+
+    Threads don't help here because of the GIL. Workers are spawned, not
+    forked, so they never inherit the event loop or the DB/HTTP pools, and
+    only on first use. Functions and arguments must be picklable.
+    """
+
+    def __init__(self, max_workers: int):
+        super().__init__(max_workers)
+        self._pool: ProcessPoolExecutor | None = None
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        try:
+            return await self._submit(self._pool, func, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge image); start a fresh pool next time
+            self.shutdown()
+            raise
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+blocking_executor = BlockingExecutor(settings.BLOCKING_IO_WORKERS)
+cpu_executor = CpuExecutor(settings.CPU_WORKERS)
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call on the shared executor"""
+    return await blocking_executor.run(func, *args, **kwargs)
+
+
+async def run_cpu(func: Callable[..., T], *args: Any) -> T:
+    """Run a CPU-bound call in the process pool"""
+    return await cpu_executor.run(func, *args)
@@ -0,0 +1,97 @@
+# app/core/health.py
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import httpx
+from sqlalchemy import text
+
+from .background import BackgroundWorker
+from .config import settings
+from .database import engine, replica_engines, pool_stats
+from .executor import blocking_executor, cpu_executor
+from .deps import token_flights, user_flights
+from app.services.storage import get_storage_service
+
+
+class HealthMonitor(BackgroundWorker):
+    """Probes Postgres, Supabase and object storage in the background.
+
+    Health endpoints serve `snapshot()` from memory, so probe storms from the
+    orchestrator never compete with real traffic for pool slots.
+    """
+
+    def __init__(self, interval: int):
+        self.interval = interval
+        self.checks: dict[str, dict] = {}
+        self.checked_at: Optional[datetime] = None
+
+    async def _timed(self, probe) -> dict:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), timeout=5)
+            status = {"status": "up"}
+        except Exception as e:
+            status = {"status": "down", "error": str(e) or type(e).__name__}
+        status["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return status
+
+    async def _probe_database(self):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def _probe_supabase(self):
+        async with httpx.AsyncClient(timeout=5) as client:
+            response = await client.get(
+                f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/health",
+                headers={"apikey": settings.SUPABASE_KEY}
+            )
+            response.raise_for_status()
+
+    async def _probe_storage(self):
+        await get_storage_service().backend.check()
+
+    async def check(self):
+        database, supabase, storage = await asyncio.gather(
+            self._timed(self._probe_database),
+            self._timed(self._probe_supabase),
+            self._timed(self._probe_storage),
+        )
+        self.checks = {"database": database, "supabase": supabase, "storage": storage}
+        self.checked_at = datetime.now(timezone.utc)
+
+    async def _run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+    @property
+    def ready(self) -> bool:
+        """Ready to serve traffic once the database has answered a probe"""
+        return self.checks.get("database", {}).get("status") == "up"
+
+    def snapshot(self) -> dict:
+        if not self.checks:
+            status = "starting"
+        elif all(check["status"] == "up" for check in self.checks.values()):
+            status = "healthy"
+        elif self.ready:
+            status = "degraded"
+        else:
+            status = "unhealthy"
+        return {
+            "status": status,
+            "checked_at": self.checked_at,
+            "checks": self.checks,
+            "pool": {
+                "primary": pool_stats(engine),
+                "replicas": [pool_stats(replica) for replica in replica_engines],
+            },
+            "executor": blocking_executor.stats(),
+            "cpu_executor": cpu_executor.stats(),
+            "singleflight": {flight.name: flight.stats() for flight in (token_flights, user_flights)},
+        }
+
+
+health_monitor = HealthMonitor(settings.HEALTH_CHECK_INTERVAL)
@@ -0,0 +1,22 @@
+# app/core/http_cache.py
+import hashlib
+from typing import Any, Optional
+
+# Clients may reuse a stored response but must revalidate it every time
+REVALIDATE = "private, no-cache"
+
+
+def weak_etag(*parts: Any) -> str:
+    """Weak ETag over the values a representation was built from"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match header (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
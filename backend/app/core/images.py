@@ -0,0 +1,54 @@
+# app/core/images.py
+"""Image variant generation.
+
+Runs inside the process pool (see executor.run_cpu), so this module keeps
+its imports to Pillow and the standard library.
+"""
+from io import BytesIO
+from typing import Optional
+
+from PIL import Image, ImageOps
+
+# Vector and unknown formats are stored as-is
+RASTER_TYPES = {"image/png", "image/jpeg", "image/webp", "image/gif"}
+
+SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "avif": {"format": "AVIF", "quality": 60},
+}
+
+
+def detect_type(data: bytes) -> Optional[str]:
+    """MIME type of a raster image in RASTER_TYPES, judged by its bytes, or None"""
+    try:
+        # Reads the header only; nothing is decoded
+        with Image.open(BytesIO(data)) as image:
+            content_type = image.get_format_mimetype()
+    except Exception:
+        return None
+    return content_type if content_type in RASTER_TYPES else None
+
+
+def make_variants(data: bytes, sizes: list[int], formats: list[str]) -> list[tuple[int, str, bytes]]:
+    """Decode once and encode a square-bounded copy per size and format.
+
+    Returns (size, format, encoded bytes) tuples. Sizes larger than the
+    original are skipped rather than upscaled.
+    """
+    with Image.open(BytesIO(data)) as source:
+        source.seek(0)  # First frame of animated images
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+    variants = []
+    for size in sorted(sizes, reverse=True):
+        if size > max(image.size):
+            continue
+        # Downscale from the previous (larger) variant; cheaper than from the original
+        image = image.copy()
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        for fmt in formats:
+            buffer = BytesIO()
+            image.save(buffer, **SAVE_OPTIONS[fmt])
+            variants.append((size, fmt, buffer.getvalue()))
+    return variants
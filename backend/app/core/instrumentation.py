@@ -0,0 +1,144 @@
+# app/core/instrumentation.py
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .config import settings
+
+# Collapses bound parameter lists so `IN ($1, $2)` and `IN ($1, $2, $3)` share a shape
+_PARAM = r"(?:\$\d+|%s|%\(\w+\)s|\?)(?:::[\w\[\]]+)?"
+_PARAMS = re.compile(rf"{_PARAM}(?:\s*,\s*{_PARAM})*")
+
+
+def statement_shape(statement: str) -> str:
+    return _PARAMS.sub("?", " ".join(statement.split()))
+
+
+@dataclass
+class QueryStats:
+    """SQL activity recorded for a single request"""
+    count: int = 0
+    total_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: Optional[str] = None
+    pool_wait: float = 0.0
+    connect_time: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """Statement shapes run at least `threshold` times - the N+1 signature"""
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def record_pool_wait(elapsed: float, connect: float = 0.0):
+    """Attribute time spent waiting for a pooled connection, and opening a new
+    one, to the current request"""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.pool_wait += elapsed
+        stats.connect_time += connect
+
+
+@dataclass
+class EndpointMetrics:
+    requests: int = 0
+    queries: int = 0
+    db_time: float = 0.0
+    max_queries: int = 0
+    repeated_statement_requests: int = 0
+
+
+class QueryMetrics:
+    """Per-endpoint aggregates of QueryStats, served by the health router"""
+
+    def __init__(self):
+        self._endpoints: dict[str, EndpointMetrics] = {}
+
+    def observe(self, endpoint: str, stats: QueryStats, repeated: dict[str, int]):
+        metrics = self._endpoints.setdefault(endpoint, EndpointMetrics())
+        metrics.requests += 1
+        metrics.queries += stats.count
+        metrics.db_time += stats.total_time
+        metrics.max_queries = max(metrics.max_queries, stats.count)
+        if repeated:
+            metrics.repeated_statement_requests += 1
+
+    def snapshot(self) -> dict:
+        return {
+            endpoint: {
+                "requests": m.requests,
+                "queries_per_request": round(m.queries / m.requests, 2),
+                "db_ms_per_request": round(m.db_time * 1000 / m.requests, 2),
+                "max_queries": m.max_queries,
+                "repeated_statement_requests": m.repeated_statement_requests,
+            }
+            for endpoint, m in self._endpoints.items()
+        }
+
+
+query_metrics = QueryMetrics()
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Time every cursor execution and attribute it to the current request"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(context):
+        if context.connection is not None and context.connection.info.get("query_start"):
+            context.connection.info["query_start"].pop()
+
+
+async def query_stats_middleware(request: Request, call_next):
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+
+    route = request.scope.get("route")
+    endpoint = f"{request.method} {route.path if route else '<unmatched>'}"
+    repeated = stats.repeated(settings.SQL_REPEAT_THRESHOLD)
+    if repeated:
+        for shape, n in repeated.items():
+            print(f"Repeated statement on {endpoint} ({n}x): {shape[:200]}")
+    query_metrics.observe(endpoint, stats, repeated)
+
+    if settings.SQL_STATS_HEADERS and settings.ENVIRONMENT == "development":
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.total_time * 1000:.2f}"
+        response.headers["X-DB-Slowest-Ms"] = f"{stats.slowest_time * 1000:.2f}"
+        response.headers["X-DB-Pool-Wait-Ms"] = f"{stats.pool_wait * 1000:.2f}"
+        response.headers["X-DB-Connect-Ms"] = f"{stats.connect_time * 1000:.2f}"
+        response.headers["X-DB-Repeated-Statements"] = str(len(repeated))
+    return response
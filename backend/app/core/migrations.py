@@ -0,0 +1,119 @@
+# app/core/migrations.py
+"""Helpers for migrations that run against a live database.
+
+Imported by alembic/env.py and by revision scripts; not used by the app.
+"""
+import time
+from typing import Optional, Sequence
+
+from alembic import context, op
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+
+
+def _timeout_sql(lock_timeout: Optional[str], statement_timeout: Optional[str], local: bool = False) -> list[str]:
+    scope = "SET LOCAL" if local else "SET"
+    statements = []
+    for name, value in (("lock_timeout", lock_timeout), ("statement_timeout", statement_timeout)):
+        if value is not None:
+            statements.append(f"{scope} {name} = '{value.replace(chr(39), chr(39) * 2)}'")
+    return statements
+
+
+def set_timeouts(connection: Optional[Connection] = None) -> None:
+    """Apply MIGRATION_LOCK_TIMEOUT / MIGRATION_STATEMENT_TIMEOUT to the session"""
+    for statement in _timeout_sql(settings.MIGRATION_LOCK_TIMEOUT, settings.MIGRATION_STATEMENT_TIMEOUT):
+        if connection is None:
+            context.execute(statement)  # Offline (--sql) mode
+        else:
+            connection.exec_driver_sql(statement)
+
+
+def local_timeouts(lock_timeout: Optional[str] = None, statement_timeout: Optional[str] = None) -> None:
+    """Override the timeouts for the rest of the current migration's transaction"""
+    for statement in _timeout_sql(lock_timeout, statement_timeout, local=True):
+        op.execute(statement)
+
+
+def _drop_invalid_index(name: str) -> None:
+    """Drop an index left INVALID by an interrupted CONCURRENTLY build"""
+    # IF NOT EXISTS would otherwise keep the broken index forever; the check
+    # needs a live connection, so offline mode skips it
+    if context.is_offline_mode():
+        return
+    invalid = op.get_bind().execute(
+        text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        print(f"Dropping invalid index {name} left by an earlier build")
+        op.drop_index(name, postgresql_concurrently=True, if_exists=True)
+
+
+def create_index_concurrently(name: str, table: str, columns: Sequence[str], **kw) -> None:
+    """CREATE INDEX CONCURRENTLY outside the migration transaction; safe to re-run"""
+    with op.get_context().autocommit_block():
+        _drop_invalid_index(name)
+        # The build doesn't block writes but can be long; lock_timeout still
+        # applies to the brief locks it takes
+        op.execute("SET statement_timeout = 0")
+        try:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **kw)
+        finally:
+            for statement in _timeout_sql(None, settings.MIGRATION_STATEMENT_TIMEOUT):
+                op.execute(statement)
+
+
+def drop_index_concurrently(name: str, table: str) -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def backfill_in_batches(
+    table: str,
+    assignments: str,
+    where: str,
+    batch_size: int = 5000,
+    pause: float = 0.1,
+    key: str = "id",
+) -> int:
+    """UPDATE {table} SET {assignments} WHERE {where} in committed batches; returns rows updated"""
+    # `where` must stop matching backfilled rows (e.g. "new_column IS NULL")
+    # or this never finishes. For a large column addition: add it nullable,
+    # backfill, then set_not_null
+    statement = f"UPDATE {table} SET {assignments} WHERE {where}"
+    if context.is_offline_mode():
+        op.execute(statement)
+        return 0
+
+    batch = text(
+        f"UPDATE {table} SET {assignments} "
+        f"WHERE {key} IN (SELECT {key} FROM {table} WHERE {where} LIMIT :batch_size)"
+    )
+    bind = op.get_bind()
+    total = 0
+    # Each batch commits on its own, so row locks are held only briefly
+    with op.get_context().autocommit_block():
+        while True:
+            updated = bind.execute(batch, {"batch_size": batch_size}).rowcount
+            total += updated
+            if updated < batch_size:
+                break
+            print(f"Backfilled {total} rows in {table}")
+            # Give replicas and autovacuum room to keep up
+            time.sleep(pause)
+    print(f"Backfilled {total} rows in {table}")
+    return total
+
+
+def set_not_null(table: str, column: str) -> None:
+    """SET NOT NULL without holding an exclusive lock for a full table scan"""
+    # The NOT VALID check is instant and validates under a lock that allows
+    # writes; Postgres 12+ then uses it to skip the scan
+    constraint = f"{table}_{column}_not_null"
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {constraint} CHECK ({column} IS NOT NULL) NOT VALID")
+    op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}")
+    op.alter_column(table, column, nullable=False)
+    op.drop_constraint(constraint, table)
@@ -0,0 +1,110 @@
+# app/core/org_domains.py
+import asyncio
+import json
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from .background import BackgroundWorker
+from .config import settings
+from .database import engine
+from app.models import Organization
+
+CHANNEL = "organization_domains"
+
+
+class OrganizationDomainIndex(BackgroundWorker):
+    """In-memory domain -> organization id map, kept current by LISTEN/NOTIFY"""
+
+    def __init__(self, listen_engine: Optional[AsyncEngine], refresh_interval: int):
+        self.listen_engine = listen_engine
+        self.refresh_interval = refresh_interval
+        # False while the listener is down; callers must query instead
+        self.ready = False
+        self._orgs: dict[str, UUID] = {}
+
+    def get(self, domain: str) -> Optional[UUID]:
+        return self._orgs.get(domain)
+
+    def add(self, domain: str, organization_id: UUID):
+        self._orgs[domain] = organization_id
+
+    async def start(self):
+        if self.listen_engine is None:
+            print("Organization domain index disabled: set DATABASE_LISTEN_URL to use it behind PgBouncer")
+            return
+        await super().start()
+
+    async def stop(self):
+        await super().stop()
+        self.ready = False
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            change = json.loads(payload)
+            if change["op"] == "delete":
+                self._orgs.pop(change["domain"], None)
+            else:
+                self._orgs[change["domain"]] = UUID(change["id"])
+        except Exception as e:
+            print(f"Bad organization domain notification {payload!r}: {e}")
+
+    async def _load(self, conn):
+        result = await conn.execute(select(Organization.domain, Organization.id))
+        self._orgs = {domain: org_id for domain, org_id in result}
+        # Notifications are only delivered while the session is idle
+        await conn.rollback()
+
+    async def _listen(self, conn):
+        raw = await conn.get_raw_connection()
+        driver_conn = raw.driver_connection
+        lost = asyncio.Event()
+        driver_conn.add_termination_listener(lambda c: lost.set())
+        # Listen first, then load, so no NOTIFY (sent by writers inside their
+        # transaction, see notify_payload) can slip between the two
+        await driver_conn.add_listener(CHANNEL, self._on_notify)
+        await self._load(conn)
+        self.ready = True
+        while True:
+            try:
+                # Periodic full reload as a safety net
+                await asyncio.wait_for(lost.wait(), timeout=self.refresh_interval)
+                raise ConnectionError("Listener connection closed")
+            except asyncio.TimeoutError:
+                await self._load(conn)
+
+    async def _run(self):
+        backoff = 1
+        while True:
+            try:
+                async with self.listen_engine.connect() as conn:
+                    try:
+                        await self._listen(conn)
+                    finally:
+                        # Never hand a LISTENing connection back to the pool
+                        await conn.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.ready = False
+                print(f"Organization domain listener error: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+
+def notify_payload(domain: str, organization_id: UUID, op: str = "upsert") -> str:
+    return json.dumps({"op": op, "domain": domain, "id": str(organization_id)})
+
+
+def _listen_engine() -> Optional[AsyncEngine]:
+    if settings.DATABASE_LISTEN_URL:
+        return create_async_engine(settings.DATABASE_LISTEN_URL, poolclass=NullPool)
+    if settings.DATABASE_POOL_MODE == "pgbouncer":
+        return None
+    return engine
+
+
+organization_domains = OrganizationDomainIndex(_listen_engine(), settings.ORG_INDEX_REFRESH_SECONDS)
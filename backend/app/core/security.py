@@ -0,0 +1,124 @@
+# app/core/security.py
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+import httpx
+import jwt
+
+from .background import BackgroundWorker
+from .config import settings
+from .supabase import supabase_client
+
+
+class UnknownSigningKeyError(Exception):
+    """Raised when a token is signed with a key we have not cached"""
+
+
+@dataclass(frozen=True)
+class TokenUser:
+    """Identity extracted from a verified Supabase access token"""
+    id: UUID
+    email: Optional[str]
+    exp: int
+
+
+class TokenVerifier(BackgroundWorker):
+    """Verifies Supabase access tokens locally against a cached JWKS / JWT secret.
+
+    The JWKS is refreshed in the background every `ttl` seconds so the hot path
+    never waits on the network. Tokens signed with a key id we don't know yet
+    (e.g. right after a key rotation) fall back to Supabase's /user endpoint.
+    """
+
+    def __init__(self, supabase_url: str, jwt_secret: Optional[str], audience: str, ttl: int):
+        self.issuer = f"{supabase_url.rstrip('/')}/auth/v1"
+        self.jwks_url = f"{self.issuer}/.well-known/jwks.json"
+        self.jwt_secret = jwt_secret
+        self.audience = audience
+        self.ttl = ttl
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+
+    async def start(self):
+        await self.refresh()
+        await super().start()
+
+    async def refresh(self):
+        """Fetch the project's JWKS and swap it in atomically"""
+        async with self._refresh_lock:
+            try:
+                async with httpx.AsyncClient(timeout=5) as client:
+                    response = await client.get(self.jwks_url)
+                    response.raise_for_status()
+                keys = {}
+                for jwk in response.json().get("keys", []):
+                    try:
+                        key = jwt.PyJWK(jwk)
+                    except jwt.PyJWTError:
+                        continue  # Skip key types we can't use (e.g. missing crypto backend)
+                    if key.key_id:
+                        keys[key.key_id] = key
+                self._keys = keys
+                self._fetched_at = time.monotonic()
+            except Exception as e:
+                # Keep serving the previous key set; the next tick will retry
+                print(f"JWKS refresh error: {e}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.ttl)
+            await self.refresh()
+
+    def _request_refresh(self):
+        """Refresh early after a cache miss, at most once per minute"""
+        if time.monotonic() - self._fetched_at < 60 or self._refresh_lock.locked():
+            return
+        asyncio.get_running_loop().create_task(self.refresh())
+
+    def decode(self, token: str) -> TokenUser:
+        """Validate signature, expiry, audience and issuer without a network call"""
+        header = jwt.get_unverified_header(token)
+        algorithm = header.get("alg")
+
+        if algorithm == "HS256":
+            if not self.jwt_secret:
+                raise UnknownSigningKeyError("No JWT secret configured")
+            key = self.jwt_secret
+        else:
+            signing_key = self._keys.get(header.get("kid"))
+            if signing_key is None:
+                self._request_refresh()
+                raise UnknownSigningKeyError(f"Unknown key id: {header.get('kid')}")
+            key = signing_key.key
+            algorithm = signing_key.algorithm_name
+
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=self.audience,
+            issuer=self.issuer,
+            options={"require": ["exp", "sub"]},
+        )
+        return TokenUser(id=UUID(claims["sub"]), email=claims.get("email"), exp=claims["exp"])
+
+
+def verify_remote(token: str) -> TokenUser:
+    """Ask Supabase to validate the token; catches revoked sessions"""
+    response = supabase_client.auth.get_user(token)
+    if not response.user:
+        raise ValueError("No user found in token")
+    claims = jwt.decode(token, options={"verify_signature": False})
+    return TokenUser(id=UUID(str(response.user.id)), email=response.user.email, exp=claims.get("exp", 0))
+
+
+token_verifier = TokenVerifier(
+    settings.SUPABASE_URL,
+    settings.SUPABASE_JWT_SECRET,
+    settings.SUPABASE_JWT_AUDIENCE,
+    settings.AUTH_JWKS_TTL_SECONDS,
+)
@@ -0,0 +1,41 @@
+# app/core/singleflight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one; nothing is cached"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self._started = 0
+        self._shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            self._started += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self._shared += 1
+        # Shielded so a cancelled waiter doesn't cancel the call for the others;
+        # the call must therefore not use request-scoped resources (e.g. the DB session)
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        self._calls.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # Retrieved here in case every waiter was cancelled
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "calls": self._started,
+            # Callers served by someone else's in-flight call
+            "shared": self._shared,
+        }
@@ -0,0 +1,46 @@
+# app/core/user_cache.py
+import time
+from collections import OrderedDict
+from typing import Optional
+from uuid import UUID
+
+from app.schemas.auth import CurrentUser
+from .config import settings
+
+
+class CurrentUserCache:
+    """Bounded, TTL'd map of user id -> CurrentUser snapshot for get_current_user.
+
+    Entries are tied to the expiry of the token that loaded them: a lookup with
+    a different token expiry misses, and no entry outlives its token. Writes to
+    the user go through `invalidate` so this worker never serves a stale row.
+    """
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[UUID, tuple[float, int, CurrentUser]]" = OrderedDict()
+
+    def get(self, user_id: UUID, token_exp: int) -> Optional[CurrentUser]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, cached_exp, snapshot = entry
+        if cached_exp != token_exp or expires_at <= time.time():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return snapshot
+
+    def set(self, user_id: UUID, token_exp: int, snapshot: CurrentUser):
+        expires_at = min(time.time() + self.ttl, token_exp)
+        self._entries[user_id] = (expires_at, token_exp, snapshot)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID):
+        self._entries.pop(user_id, None)
+
+
+current_user_cache = CurrentUserCache(settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_SECONDS)
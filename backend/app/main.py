@@ -1,9 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1 import auth
+from app.api.v1 import auth, uploads
 from app.api import health
+from app.core.config import settings
+from app.core.security import token_verifier
+from app.core.executor import blocking_executor, cpu_executor
+from app.core.org_domains import organization_domains
+from app.core.instrumentation import query_stats_middleware
+from app.core.database import pool_liveness_monitor
+from app.core.health import health_monitor
+from app.services.storage import get_storage_service
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_storage_service()  # Build the shared storage backend once, before traffic arrives
+    if settings.AUTH_VERIFY_MODE == "local":
+        await token_verifier.start()
+    await organization_domains.start()
+    if settings.DATABASE_POOL_MODE == "pgbouncer":
+        await pool_liveness_monitor.start()
+    await health_monitor.start()
+    yield
+    await health_monitor.stop()
+    await pool_liveness_monitor.stop()
+    await organization_domains.stop()
+    await token_verifier.stop()
+    blocking_executor.shutdown()
+    cpu_executor.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+
+app.middleware("http")(query_stats_middleware)
 
 # Add CORS middleware
 app.add_middleware(
@@ -19,6 +50,15 @@ app.add_middleware(
 
 app.include_router(health.router, prefix="/api/v1/health", tags=["health"])
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
+app.include_router(uploads.router, prefix="/api/v1/uploads", tags=["uploads"])
+
+if settings.STORAGE_BACKEND == "local":
+    # Uploaded files are served by the API itself; put a CDN or nginx in front in production
+    app.mount(
+        settings.LOCAL_STORAGE_URL_PATH,
+        StaticFiles(directory=settings.LOCAL_STORAGE_PATH, check_dir=False),
+        name="media"
+    )
 
 @app.get("/")
 async def root():
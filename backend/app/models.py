@@ -1,7 +1,7 @@
 from sqlalchemy import (
-    Column, String, DateTime, Enum, ForeignKey
+    Column, String, DateTime, Enum, ForeignKey, Index
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -32,6 +32,7 @@ class Organization(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
     logo_url = Column(String, nullable=True)
+    logo_variants = Column(JSONB, nullable=True)  # {format: {size: url}}
     workspace_url = Column(String, nullable=True)
     members = relationship("OrganizationMember", back_populates="organization", cascade="all, delete-orphan")
     invites = relationship("OrganizationInvite", back_populates="organization", cascade="all, delete-orphan")
@@ -45,6 +46,7 @@ class User(Base):
     last_name = Column(String, nullable=True)
     full_name = Column(String, nullable=True)
     image_url = Column(String, nullable=True)
+    image_variants = Column(JSONB, nullable=True)  # {format: {size: url}}
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
 
@@ -53,9 +55,14 @@ class User(Base):
 
 class OrganizationMember(Base):
     __tablename__ = "organization_members"
+    __table_args__ = (
+        # Members by status, and keyset pagination of the member list
+        Index("ix_organization_members_organization_id_status", "organization_id", "status"),
+        Index("ix_organization_members_organization_id_created_at_id", "organization_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id"), nullable=False)
     role = Column(Enum(MemberRole, name="memberrole"), nullable=False)
     status = Column(Enum(MemberStatus, name="memberstatus"), nullable=False)
@@ -69,6 +76,10 @@ class OrganizationMember(Base):
 
 class OrganizationInvite(Base):
     __tablename__ = "organization_invites"
+    __table_args__ = (
+        # Pending-invite check in bulk_create_invites
+        Index("ix_organization_invites_organization_id_email", "organization_id", "email"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String, nullable=False)
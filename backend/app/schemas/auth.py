@@ -1,14 +1,32 @@
 # app/schemas/user.py
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from uuid import UUID
 from datetime import datetime
-from typing import Optional
-from app.models import MemberRole, MemberStatus 
+from typing import Dict, List, Optional
+from app.models import InviteRole, MemberRole, MemberStatus 
+
+ImageVariants = Dict[str, Dict[str, str]]  # {format: {size: url}}, see StorageService.create_variants
+
 class UserCreate(BaseModel):
     email: EmailStr
     full_name: Optional[str] = None
     supabase_user_id: UUID
 
+class BulkUserCreate(BaseModel):
+    users: List[UserCreate] = Field(..., min_length=1, max_length=10000)
+
+class BulkUserResult(BaseModel):
+    email: EmailStr
+    status: str  # 'created', 'exists', 'duplicate' or 'wrong_domain'
+    id: Optional[UUID] = None
+    organization_id: Optional[UUID] = None
+    organization_status: Optional[MemberStatus] = None
+
+class BulkUserResponse(BaseModel):
+    created: int
+    skipped: int
+    results: List[BulkUserResult]
+
 class UserLogin(BaseModel):
     email: EmailStr
     supabase_user_id: str
@@ -49,6 +67,22 @@ class UserResponse(BaseModel):
         from_attributes = True  # Use this for Pydantic v2
         # or use orm_mode = True for Pydantic v1
 
+class CurrentUser(BaseModel):
+    """Read-only snapshot of the authenticated user, detached from any session"""
+    id: UUID
+    email: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    full_name: Optional[str] = None
+    image_url: Optional[str] = None
+    image_variants: Optional[ImageVariants] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+        frozen = True
+
 class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     first_name: Optional[str] = None
@@ -62,6 +96,7 @@ class OrganizationResponse(BaseModel):
     domain: str
     workspace_url: str
     logo_url: Optional[str] = None
+    logo_variants: Optional[ImageVariants] = None
     role: MemberRole
 
     class Config:
@@ -78,6 +113,7 @@ class OrganizationBase(BaseModel):
     name: str
     domain: str
     logo_url: Optional[str] = None
+    logo_variants: Optional[ImageVariants] = None
 class OrganizationCreate(OrganizationBase):
     workspace_url: str
 
@@ -93,4 +129,48 @@ class OnboardingStatusResponse(BaseModel):
     organization_name: Optional[str] = None
     organization_domain: Optional[str] = None
     domain_exists: Optional[bool] = None
-    domain: Optional[str] = None
\ No newline at end of file
+    domain: Optional[str] = None
+
+class BulkInviteCreate(BaseModel):
+    emails: List[EmailStr] = Field(..., min_length=1, max_length=10000)
+    role: InviteRole = InviteRole.member
+    expires_in_days: int = Field(7, ge=1, le=30)
+
+class InviteResult(BaseModel):
+    email: EmailStr
+    status: str  # 'invited', 'already_invited' or 'duplicate'
+    token: Optional[str] = None
+    expires_at: Optional[datetime] = None
+
+class BulkInviteResponse(BaseModel):
+    invited: int
+    skipped: int
+    results: List[InviteResult]
+
+class AcceptInviteRequest(BaseModel):
+    token: str
+
+class AcceptInviteResponse(BaseModel):
+    organization_id: UUID
+    role: MemberRole
+    status: MemberStatus
+
+class MemberListItem(BaseModel):
+    id: UUID
+    user_id: UUID
+    email: EmailStr
+    full_name: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    image_url: Optional[str] = None
+    image_variants: Optional[ImageVariants] = None
+    role: MemberRole
+    status: MemberStatus
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class MemberListResponse(BaseModel):
+    items: List[MemberListItem]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to fetch the next page
@@ -0,0 +1,26 @@
+# app/schemas/uploads.py
+from pydantic import BaseModel, Field
+from typing import Dict, Literal, Optional
+from app.schemas.auth import ImageVariants
+
+UploadTarget = Literal["organization_logo", "user_image"]
+
+class PresignUploadRequest(BaseModel):
+    target: UploadTarget
+    filename: str
+    content_type: str
+    content_length: int = Field(..., gt=0)
+
+class PresignUploadResponse(BaseModel):
+    url: str
+    fields: Dict[str, str]  # Send as form fields before the file in the POST
+    key: str
+    expires_in: int
+
+class ConfirmUploadRequest(BaseModel):
+    target: UploadTarget
+    key: str
+
+class ConfirmUploadResponse(BaseModel):
+    url: str
+    variants: Optional[ImageVariants] = None
@@ -1,16 +1,39 @@
 # app/services/auth.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from uuid import UUID
+from uuid import UUID, uuid4
+from datetime import datetime, timedelta, timezone
+import secrets
+import base64
+import json
+from sqlalchemy import delete, exists, func, tuple_
 from sqlalchemy.future import select
+from sqlalchemy.dialects.postgresql import insert
 from app.schemas.auth import UserCreate, UserLogin, OrganizationCreate, UserUpdate, UserResponse
-from app.models import User, Organization, OrganizationMember, MemberRole, MemberStatus
+from app.models import User, Organization, OrganizationMember, OrganizationInvite, InviteRole, MemberRole, MemberStatus
 from app.core.supabase import supabase_client
-from sqlalchemy.orm import selectinload 
+from app.core.executor import run_blocking
+from app.core.user_cache import current_user_cache
+from app.core.org_domains import CHANNEL, notify_payload, organization_domains
+from app.core.config import settings
+from app.core.database import primary_stickiness
+from sqlalchemy.orm import aliased, selectinload 
 from sqlalchemy.exc import SQLAlchemyError
 
 class AuthService:
     def __init__(self, session: AsyncSession):
         self.session = session
+        # Request-scoped memo of lookups; an AuthService lives for one request
+        self._memo: dict = {}
+
+    async def _memoized(self, key: tuple, load):
+        """Run `load` at most once per key for the lifetime of this service"""
+        if key not in self._memo:
+            self._memo[key] = await load()
+        return self._memo[key]
+
+    def _forget(self):
+        """Drop memoized lookups after this service writes"""
+        self._memo.clear()
 
     async def register_user(self, user_data: UserCreate):
         try:
@@ -19,7 +42,7 @@ class AuthService:
                 raise ValueError("User with this email already exists")
             # 1. Check if email domain exists in any organization
             domain = user_data.email.split('@')[1]
-            existing_org = await self._get_organization_by_domain(domain)
+            existing_org_id = await self._get_organization_id_by_domain(domain)
 
             # # 2. Create Supabase auth user
             # supabase_user = await self._create_supabase_user(user_data)
@@ -34,24 +57,26 @@ class AuthService:
             self.session.add(db_user)
             await self.session.flush()
 
-            if existing_org:
+            if existing_org_id:
                 member = OrganizationMember(
                 user_id=db_user.id,
-                organization_id=existing_org.id,
+                organization_id=existing_org_id,
                 role=MemberRole.member,
                 status=MemberStatus.invited
                 )
                 self.session.add(member)
 
             await self.session.commit()
+            self._forget()
+            primary_stickiness.mark(db_user.id)
             # await self.session.refresh(db_user) # Refresh to load relationships if needed later
             return {
             "id": db_user.id,
             "email": db_user.email,
             "full_name": db_user.full_name,
-            "has_existing_org": bool(existing_org),
+            "has_existing_org": bool(existing_org_id),
             "domain": domain,
-            "organization_status": member.status if existing_org else None # Send status back
+            "organization_status": member.status if existing_org_id else None # Send status back
             }
         except SQLAlchemyError as e:
             await self.session.rollback()
@@ -63,37 +88,281 @@ class AuthService:
             raise
     
 
+    async def bulk_register_users(self, organization_id: UUID, users: list[UserCreate]):
+        """Register many users into an organization with batched multi-row inserts"""
+        organization = await self.session.get(Organization, organization_id)
+        if not organization:
+            raise ValueError("Organization not found")
+        domain = organization.domain.lower()
+
+        # One result per input row, in input order
+        results = []
+        pending = {}
+        seen_emails = set()
+        rows = []
+        for user_data in users:
+            email = user_data.email
+            result = {"email": email, "status": "exists"}
+            results.append(result)
+            # Admins can only provision users in their own organization's domain
+            if email.split('@')[1].lower() != domain:
+                result["status"] = "wrong_domain"
+                continue
+            if email.lower() in seen_emails or user_data.supabase_user_id in pending:
+                result["status"] = "duplicate"
+                continue
+            seen_emails.add(email.lower())
+            pending[user_data.supabase_user_id] = result
+            rows.append({
+                "id": user_data.supabase_user_id,
+                "email": email,
+                "full_name": user_data.full_name,
+            })
+
+        try:
+            batch_size = settings.BULK_INSERT_BATCH_SIZE
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                inserted = await self.session.execute(
+                    insert(User)
+                    .values(batch)
+                    .on_conflict_do_nothing()  # Existing email or id: reported as 'exists'
+                    .returning(User.id)
+                )
+                members = []
+                for (user_id,) in inserted:
+                    pending[user_id].update(
+                        status="created",
+                        id=user_id,
+                        organization_id=organization_id,
+                        organization_status=MemberStatus.invited
+                    )
+                    members.append({
+                        "id": uuid4(),
+                        "user_id": user_id,
+                        "organization_id": organization_id,
+                        "role": MemberRole.member,
+                        "status": MemberStatus.invited,
+                    })
+                if members:
+                    await self.session.execute(insert(OrganizationMember).values(members))
+
+            await self.session.commit()
+            self._forget()
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            print(f"Database error in bulk_register_users: {e}")
+            raise
+
+        created = sum(1 for result in results if result["status"] == "created")
+        return {
+            "created": created,
+            "skipped": len(users) - created,
+            "results": results,
+        }
+
+    async def bulk_create_invites(self, organization_id: UUID, emails: list[str], role: InviteRole, expires_in_days: int):
+        """Create invites for many emails with one existence check and one insert per batch"""
+        # One result per input row; the first copy of an address (compared
+        # case-insensitively, as accept_invite does) is the one invited
+        results = []
+        first = {}
+        for email in emails:
+            result = {"email": email, "status": "invited"}
+            results.append(result)
+            if email.lower() in first:
+                result["status"] = "duplicate"
+                continue
+            first[email.lower()] = result
+        pending = list(first)
+
+        expires_at = datetime.now(timezone.utc) + timedelta(days=expires_in_days)
+        try:
+            batch_size = settings.BULK_INSERT_BATCH_SIZE
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                # Invites are stored lowercased, so this can use the
+                # (organization_id, email) index
+                existing = await self.session.execute(
+                    select(OrganizationInvite.email)
+                    .where(
+                        OrganizationInvite.organization_id == organization_id,
+                        OrganizationInvite.email.in_(batch),
+                        OrganizationInvite.expires_at > func.now()
+                    )
+                )
+                # Re-running an import must not issue fresh tokens
+                for (email,) in existing:
+                    first[email]["status"] = "already_invited"
+
+                rows = []
+                for email in batch:
+                    if first[email]["status"] != "invited":
+                        continue
+                    token = secrets.token_urlsafe(32)
+                    first[email].update(token=token, expires_at=expires_at)
+                    rows.append({
+                        "id": uuid4(),
+                        "email": email,
+                        "organization_id": organization_id,
+                        "role": role,
+                        "token": token,
+                        "expires_at": expires_at,
+                    })
+                if rows:
+                    await self.session.execute(insert(OrganizationInvite).values(rows))
+
+            await self.session.commit()
+            self._forget()
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            print(f"Database error in bulk_create_invites: {e}")
+            raise
+
+        invited = sum(1 for result in results if result["status"] == "invited")
+        return {
+            "invited": invited,
+            "skipped": len(emails) - invited,
+            "results": results,
+        }
+
+    async def accept_invite(self, user_id: UUID, email: str, token: str):
+        """Consume an invite and activate the user's membership in one transaction"""
+        # The unique index on token makes this a single index lookup; DELETE ... RETURNING
+        # consumes the invite atomically so it can't be accepted twice.
+        result = await self.session.execute(
+            delete(OrganizationInvite)
+            .where(
+                OrganizationInvite.token == token,
+                func.lower(OrganizationInvite.email) == email.lower(),
+                OrganizationInvite.expires_at > func.now()
+            )
+            .returning(OrganizationInvite.organization_id, OrganizationInvite.role)
+        )
+        invite = result.one_or_none()
+        if not invite:
+            await self.session.rollback()
+            raise ValueError("Invalid or expired invite")
+
+        member = await self._get_user_membership(user_id)
+        if member and member.organization_id != invite.organization_id:
+            await self.session.rollback()
+            raise ValueError("User already belongs to an organization")
+
+        role = MemberRole(invite.role)
+        if member:
+            # Domain auto-join leaves an invited membership behind; activate it
+            member.status = MemberStatus.active
+            if member.role != MemberRole.admin:
+                member.role = role
+        else:
+            member = OrganizationMember(
+                user_id=user_id,
+                organization_id=invite.organization_id,
+                role=role,
+                status=MemberStatus.active
+            )
+            self.session.add(member)
+
+        await self.session.commit()
+        self._forget()
+        current_user_cache.invalidate(user_id)
+        return {
+            "organization_id": member.organization_id,
+            "role": member.role,
+            "status": member.status
+        }
+
+    async def list_members(
+        self,
+        organization_id: UUID,
+        status: MemberStatus | None = None,
+        role: MemberRole | None = None,
+        limit: int = 50,
+        cursor: str | None = None
+    ):
+        """Page through an organization's members ordered by (created_at, id)"""
+        # Keyset pagination: every page costs the same regardless of depth
+        query = (
+            select(
+                OrganizationMember.id,
+                OrganizationMember.user_id,
+                OrganizationMember.role,
+                OrganizationMember.status,
+                OrganizationMember.created_at,
+                User.email,
+                User.full_name,
+                User.first_name,
+                User.last_name,
+                User.image_url,
+                User.image_variants
+            )
+            .join(User, User.id == OrganizationMember.user_id)
+            .where(OrganizationMember.organization_id == organization_id)
+            .order_by(OrganizationMember.created_at, OrganizationMember.id)
+            .limit(limit + 1)  # One extra row tells us whether there's a next page
+        )
+        if status:
+            query = query.where(OrganizationMember.status == status)
+        if role:
+            query = query.where(OrganizationMember.role == role)
+        if cursor:
+            after_created_at, after_id = self._decode_member_cursor(cursor)
+            query = query.where(
+                tuple_(OrganizationMember.created_at, OrganizationMember.id) > tuple_(after_created_at, after_id)
+            )
+
+        rows = [dict(row) for row in (await self.session.execute(query)).mappings()]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_member_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return {"items": rows, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _encode_member_cursor(created_at: datetime, member_id: UUID) -> str:
+        raw = json.dumps([created_at.isoformat(), str(member_id)])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode_member_cursor(cursor: str) -> tuple[datetime, UUID]:
+        try:
+            created_at, member_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return datetime.fromisoformat(created_at), UUID(member_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+
     async def login_user(self, login_data: UserLogin):
         try:
             print(f"Processing login for email: {login_data.email} and supabase_user_id: {login_data.supabase_user_id}")
-            # 1. Authenticate with Supabase
-            user = await self._get_user_by_email(login_data.email)
-
-            if not user:
-                print(f"Creating new user for email: {login_data.email}")
-                # Create user if they don't exist (first time Supabase login)
-                user = User(
-                    id=login_data.supabase_user_id,
+            # 1. Create user if they don't exist (first time Supabase login).
+            # ON CONFLICT makes concurrent first logins a no-op instead of a unique violation.
+            inserted = await self.session.execute(
+                insert(User)
+                .values(
+                    id=UUID(login_data.supabase_user_id),
                     email=login_data.email,
                     full_name=None  # Will be set during onboarding
                 )
-                self.session.add(user)
-                await self.session.commit()
-                print(f"New user created with ID: {user.id}") 
-
-            # 3. Get organization status
-            member = await self._get_user_membership(user.id)
-            organization = None
-            if member:
-                # Use join to fetch organization data in a single query
-                result = await self.session.execute(
-                select(Organization)
-                .join(OrganizationMember)
-                .where(OrganizationMember.user_id == user.id)
+                .on_conflict_do_nothing()
+            )
+
+            # 2. Get user, membership and organization in a single joined read
+            result = await self.session.execute(
+                select(User, OrganizationMember, Organization)
+                .outerjoin(OrganizationMember, OrganizationMember.user_id == User.id)
+                .outerjoin(Organization, Organization.id == OrganizationMember.organization_id)
+                .where(User.email == login_data.email)
                 .limit(1)
             )
-                organization = result.scalar_one_or_none()
-            
+            user, member, organization = result.one()
+
+            if inserted.rowcount:
+                await self.session.commit()
+                self._forget()
+                primary_stickiness.mark(user.id)
+                print(f"New user created with ID: {user.id}")
+
             return {
                 "user": {
                     "id": user.id,
@@ -118,10 +387,12 @@ class AuthService:
             raise ValueError("Invalid credentials")
     async def _get_user_by_email(self, email: str) -> User:
         """Retrieve a user by email address"""
-        result = await self.session.execute(
-            select(User).where(User.email == email)
-        )
-        return result.scalar_one_or_none()
+        async def load():
+            result = await self.session.execute(
+                select(User).where(User.email == email)
+            )
+            return result.scalar_one_or_none()
+        return await self._memoized(("user_by_email", email), load)
     async def update_user(self, user_id: UUID, user_data: UserUpdate):
         """Update user information"""
         user = await self._get_user_by_id(user_id)
@@ -132,6 +403,8 @@ class AuthService:
             setattr(user, field, value)
         
         await self.session.commit()
+        self._forget()
+        current_user_cache.invalidate(user_id)
         return user
     # async def _get_user_membership(self, user_id: UUID) -> OrganizationMember:
     #     """Retrieve a user's organization membership"""
@@ -155,7 +428,7 @@ class AuthService:
 
     async def _authenticate_supabase(self, login_data: UserLogin):
         try:
-            return await supabase_client.auth.sign_in_with_password({
+            return await run_blocking(supabase_client.auth.sign_in_with_password, {
                 "email": login_data.email,
                 "password": login_data.password
             })
@@ -165,7 +438,7 @@ class AuthService:
     async def initiate_password_reset(self, email: str):
         """Initiates the password reset process via Supabase"""
         try:
-            await supabase_client.auth.reset_password_email(email)
+            await run_blocking(supabase_client.auth.reset_password_email, email)
         except Exception as e:
             # Log the error but return generic message for security
             print(f"Password reset error: {str(e)}")
@@ -174,14 +447,14 @@ class AuthService:
     async def complete_password_reset(self, token: str, new_password: str):
         """Completes the password reset process"""
         try:
-            await supabase_client.auth.reset_password(token, new_password)
+            await run_blocking(supabase_client.auth.reset_password, token, new_password)
         except Exception as e:
             raise ValueError(f"Invalid or expired reset token: {str(e)}")
     async def handle_email_verification(self, token: str):
         """Handles post-verification business logic"""
         try:
             # Verify token with Supabase
-            user = await supabase_client.auth.verify_email(token)
+            user = await run_blocking(supabase_client.auth.verify_email, token)
             
             # Get user from our database
             db_user = await self._get_user_by_email(user.email)
@@ -197,6 +470,7 @@ class AuthService:
             if member.status == MemberStatus.invited:
                 member.status = MemberStatus.active
                 await self.session.commit()
+                self._forget()
 
             return {
                 "is_new_org": member.role == MemberRole.admin,
@@ -206,6 +480,27 @@ class AuthService:
         except Exception as e:
             raise ValueError(f"Email verification failed: {str(e)}")
         
+    async def get_onboarding_version(self, user_id: UUID) -> tuple | None:
+        """Version of everything get_onboarding_status depends on, or None if no user"""
+        # The membership count catches removed memberships; domain_exists
+        # catches organizations created by someone else for the user's domain
+        domain_org = aliased(Organization)
+        result = await self.session.execute(
+            select(
+                User.updated_at,
+                func.max(OrganizationMember.updated_at),
+                func.max(Organization.updated_at),
+                func.count(OrganizationMember.id),
+                exists().where(domain_org.domain == func.split_part(User.email, "@", 2)),
+            )
+            .outerjoin(OrganizationMember, OrganizationMember.user_id == User.id)
+            .outerjoin(Organization, Organization.id == OrganizationMember.organization_id)
+            .where(User.id == user_id)
+            .group_by(User.id)
+        )
+        row = result.one_or_none()
+        return tuple(row) if row else None
+
     async def get_onboarding_status(self, user_id: UUID):
         """Get user details and their organization membership status."""
         # Fetch user and their first membership with the organization loaded
@@ -218,13 +513,19 @@ class AuthService:
 
         if not user:
             raise ValueError("User not found")
-        # Check if domain exists in any organization
-        domain = user.email.split('@')[1]
-        existing_org = await self._get_organization_by_domain(domain)
-
         membership = user.organization_memberships[0] if user.organization_memberships else None
         organization = membership.organization if membership else None
 
+        # Seed the memo with what the eager load already gave us
+        self._memo[("user_by_id", user.id)] = user
+        self._memo[("membership", user.id)] = membership
+        for member in user.organization_memberships:
+            self._memo[("org_by_domain", member.organization.domain)] = member.organization
+
+        # Check if domain exists in any organization
+        domain = user.email.split('@')[1]
+        existing_org_id = await self._get_organization_id_by_domain(domain)
+
         return {
             "user_id": user.id,
             "email": user.email,
@@ -236,28 +537,70 @@ class AuthService:
             "organization_id": organization.id if organization else None,
             "organization_name": organization.name if organization else None,
             "organization_domain": organization.domain if organization else None,
-            "domain_exists": bool(existing_org),
+            "domain_exists": bool(existing_org_id),
             "domain": domain,
         }
     async def _get_organization_by_domain(self, domain: str) -> Organization:
         """Retrieve an organization by domain"""
-        result = await self.session.execute(
-            select(Organization).where(Organization.domain == domain)
-        )
-        return result.scalar_one_or_none()
+        async def load():
+            result = await self.session.execute(
+                select(Organization).where(Organization.domain == domain)
+            )
+            return result.scalar_one_or_none()
+        return await self._memoized(("org_by_domain", domain), load)
+    async def _get_organization_id_by_domain(self, domain: str) -> UUID | None:
+        """Resolve a domain to its organization id, from the in-memory index when it's live"""
+        if organization_domains.ready:
+            return organization_domains.get(domain)
+        organization = await self._get_organization_by_domain(domain)
+        return organization.id if organization else None
     async def _get_user_membership(self, user_id: UUID) -> OrganizationMember:
-        result = await self.session.execute(
-            select(OrganizationMember)
-            .where(OrganizationMember.user_id == user_id)
-        )
-        return result.scalar_one_or_none()
+        async def load():
+            result = await self.session.execute(
+                select(OrganizationMember)
+                .where(OrganizationMember.user_id == user_id)
+            )
+            return result.scalar_one_or_none()
+        return await self._memoized(("membership", user_id), load)
     
+    async def update_organization_logo(self, organization_id: UUID, logo_url: str, logo_variants: dict | None = None):
+        """Point an organization at a newly uploaded logo"""
+        organization = await self.session.get(Organization, organization_id)
+        if not organization:
+            raise ValueError("Organization not found")
+        organization.logo_url = logo_url
+        organization.logo_variants = logo_variants
+        await self.session.commit()
+        self._forget()
+        return organization
+
+    async def update_user_image(self, user_id: UUID, image_url: str, image_variants: dict | None = None):
+        """Point a user at a newly uploaded profile image"""
+        user = await self._get_user_by_id(user_id)
+        if not user:
+            raise ValueError("User not found")
+        user.image_url = image_url
+        user.image_variants = image_variants
+        await self.session.commit()
+        self._forget()
+        current_user_cache.invalidate(user_id)
+        return user
+
+    async def _require_admin(self, user_id: UUID) -> OrganizationMember:
+        """Return the user's membership, or raise if they are not an active admin"""
+        member = await self._get_user_membership(user_id)
+        if not member or member.role != MemberRole.admin or member.status != MemberStatus.active:
+            raise PermissionError("Only organization admins can perform this action")
+        return member
+
     async def _get_user_by_id(self, user_id: UUID) -> User:
         """Retrieve a user by ID"""
-        result = await self.session.execute(
-            select(User).where(User.id == user_id)
-        )
-        return result.scalar_one_or_none()
+        async def load():
+            result = await self.session.execute(
+                select(User).where(User.id == user_id)
+            )
+            return result.scalar_one_or_none()
+        return await self._memoized(("user_by_id", user_id), load)
     
     async def create_organization(self, user_id: UUID, org_data: OrganizationCreate):
         """Create organization during onboarding"""
@@ -275,7 +618,8 @@ class AuthService:
             name=org_data.name,
             domain=org_data.domain,
             workspace_url=org_data.workspace_url,
-            logo_url=org_data.logo_url
+            logo_url=org_data.logo_url,
+            logo_variants=org_data.logo_variants
         )
         self.session.add(new_org)
         
@@ -287,8 +631,16 @@ class AuthService:
             status=MemberStatus.active
         )
         self.session.add(member)
-        
+        await self.session.flush()
+
+        # Delivered to every worker's domain index when this transaction commits
+        await self.session.execute(
+            select(func.pg_notify(CHANNEL, notify_payload(new_org.domain, new_org.id)))
+        )
         await self.session.commit()
+        self._forget()
+        current_user_cache.invalidate(user_id)
+        organization_domains.add(new_org.domain, new_org.id)
         # await self.session.refresh(new_org)  # Refresh to get the generated ID
         return {
             "id": new_org.id,
@@ -296,5 +648,6 @@ class AuthService:
             "domain": new_org.domain,
             "workspace_url": new_org.workspace_url,
             "logo_url": new_org.logo_url,
+            "logo_variants": new_org.logo_variants,
             "role": MemberRole.admin
         }
\ No newline at end of file
@@ -0,0 +1,5 @@
+# app/services/storage/__init__.py
+from .base import StorageBackend, UnsupportedOperation
+from .service import StorageService, content_key, create_backend, get_storage_service
+
+__all__ = ["StorageBackend", "StorageService", "content_key", "create_backend", "get_storage_service", "UnsupportedOperation"]
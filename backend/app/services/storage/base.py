@@ -0,0 +1,50 @@
+# app/services/storage/base.py
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from fastapi import UploadFile
+
+
+class UnsupportedOperation(Exception):
+    """Raised when a backend doesn't offer an optional feature, e.g. presigned uploads"""
+
+
+class StorageBackend(ABC):
+    """Where objects live. StorageService builds hashing, dedup and image
+    variants on top of these primitives, so a backend only moves bytes.
+
+    Every method that touches the network or disk is async and must not
+    block the event loop.
+    """
+
+    @abstractmethod
+    async def put(self, key: str, body: bytes, content_type: str, cache_control: Optional[str] = None):
+        """Store a small object held in memory"""
+
+    @abstractmethod
+    async def put_file(self, key: str, file: UploadFile, content_type: str):
+        """Store an upload, streaming from the file's current position"""
+
+    @abstractmethod
+    async def head(self, key: str) -> Optional[dict]:
+        """{"size", "content_type"} of an object, or None if it doesn't exist"""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    async def list_keys(self, prefix: str) -> list[str]:
+        ...
+
+    @abstractmethod
+    def public_url(self, key: str) -> str:
+        ...
+
+    def presign_upload(self, key: str, content_type: str, max_size: int, expires_in: int) -> dict:
+        """Presigned POST ({"url", "fields"}) for direct browser uploads"""
+        raise UnsupportedOperation(f"{type(self).__name__} does not support direct uploads")
+
+    @abstractmethod
+    async def check(self):
+        """Raise if the backend is unreachable; used by the health monitor"""
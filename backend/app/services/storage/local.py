@@ -0,0 +1,89 @@
+# app/services/storage/local.py
+import mimetypes
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.core.executor import run_blocking
+from .base import StorageBackend
+
+mimetypes.add_type("image/avif", ".avif")
+mimetypes.add_type("image/webp", ".webp")
+
+
+class LocalBackend(StorageBackend):
+    """Objects as files under LOCAL_STORAGE_PATH, served by the API's static
+    mount at LOCAL_STORAGE_URL_PATH (see main.py).
+
+    For development, CI and load tests without a bucket, and for single-node
+    on-prem installs. Content types come from the key's extension, and
+    writes go through a temporary file so readers never see partial objects.
+    """
+
+    def __init__(self):
+        self.root = Path(settings.LOCAL_STORAGE_PATH).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.public_base = (settings.STORAGE_PUBLIC_URL or settings.LOCAL_STORAGE_URL_PATH).rstrip("/")
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root):
+            raise ValueError(f"Invalid storage key {key!r}")
+        return path
+
+    def _write(self, key: str, source):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp, "wb") as out:
+                if isinstance(source, bytes):
+                    out.write(source)
+                else:
+                    shutil.copyfileobj(source, out, settings.STORAGE_PART_SIZE)
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    async def put(self, key: str, body: bytes, content_type: str, cache_control: Optional[str] = None):
+        await run_blocking(self._write, key, body)
+
+    async def put_file(self, key: str, file: UploadFile, content_type: str):
+        await run_blocking(self._write, key, file.file)
+
+    async def head(self, key: str) -> Optional[dict]:
+        try:
+            stat = await run_blocking(self._path(key).stat)
+        except FileNotFoundError:
+            return None
+        return {"size": stat.st_size, "content_type": mimetypes.guess_type(key)[0]}
+
+    async def get(self, key: str) -> bytes:
+        return await run_blocking(self._path(key).read_bytes)
+
+    def _list(self, prefix: str) -> list[str]:
+        directory = self._path(prefix) if prefix.endswith("/") else self._path(prefix).parent
+        if not directory.is_dir():
+            return []
+        keys = (
+            path.relative_to(self.root).as_posix()
+            for path in directory.rglob("*")
+            if path.is_file() and not path.name.endswith(".tmp")
+        )
+        return sorted(key for key in keys if key.startswith(prefix))
+
+    async def list_keys(self, prefix: str) -> list[str]:
+        return await run_blocking(self._list, prefix)
+
+    def public_url(self, key: str) -> str:
+        return f"{self.public_base}/{key}"
+
+    async def check(self):
+        if not await run_blocking(os.access, self.root, os.W_OK):
+            raise PermissionError(f"{self.root} is not writable")
@@ -0,0 +1,164 @@
+# app/services/storage/s3.py
+import asyncio
+from typing import Optional
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.core.executor import run_blocking
+from .base import StorageBackend
+
+
+class S3Backend(StorageBackend):
+    """DigitalOcean Spaces or any other S3-compatible store (MinIO, AWS).
+
+    One boto3 client is shared by the worker; calls run on the blocking
+    executor. Without STORAGE_ENDPOINT_URL the Spaces endpoint for
+    DO_SPACE_REGION is used.
+    """
+
+    def __init__(self):
+        endpoint_url = settings.STORAGE_ENDPOINT_URL
+        self.s3 = boto3.client(
+            's3',
+            endpoint_url=endpoint_url or f"https://{settings.DO_SPACE_REGION}.digitaloceanspaces.com",
+            region_name=settings.DO_SPACE_REGION,
+            config=Config(
+                signature_version='s3v4',
+                max_pool_connections=settings.STORAGE_MAX_POOL_CONNECTIONS,
+                tcp_keepalive=True,  # Reuse TLS connections across uploads
+                connect_timeout=settings.STORAGE_CONNECT_TIMEOUT,
+                read_timeout=settings.STORAGE_READ_TIMEOUT,
+                # MinIO and most self-hosted stores don't do virtual-host buckets
+                s3={"addressing_style": "path" if endpoint_url else "auto"},
+            ),
+            aws_access_key_id=settings.DO_SPACE_KEY,
+            aws_secret_access_key=settings.DO_SPACE_SECRET
+        )
+        self.bucket = settings.DO_SPACE_BUCKET
+        if settings.STORAGE_PUBLIC_URL:
+            self.public_base = settings.STORAGE_PUBLIC_URL.rstrip("/")
+        elif endpoint_url:
+            self.public_base = f"{endpoint_url.rstrip('/')}/{self.bucket}"
+        else:
+            self.public_base = f"https://{self.bucket}.{settings.DO_SPACE_REGION}.digitaloceanspaces.com"
+
+    async def put(self, key: str, body: bytes, content_type: str, cache_control: Optional[str] = None):
+        extra = {"CacheControl": cache_control} if cache_control else {}
+        await run_blocking(
+            self.s3.put_object,
+            Bucket=self.bucket,
+            Key=key,
+            Body=body,
+            ContentType=content_type,
+            ACL='public-read',
+            **extra
+        )
+
+    async def put_file(self, key: str, file: UploadFile, content_type: str):
+        """Single PUT if the file fits in one STORAGE_PART_SIZE chunk, otherwise
+        a multipart upload with up to STORAGE_UPLOAD_CONCURRENCY parts in flight,
+        so memory per upload stays bounded regardless of file size.
+        """
+        first_chunk = await file.read(settings.STORAGE_PART_SIZE)
+        if len(first_chunk) < settings.STORAGE_PART_SIZE:
+            await self.put(key, first_chunk, content_type)
+        else:
+            await self._multipart_upload(file, key, content_type, first_chunk)
+
+    async def head(self, key: str) -> Optional[dict]:
+        try:
+            response = await run_blocking(self.s3.head_object, Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return {"size": response["ContentLength"], "content_type": response.get("ContentType")}
+
+    async def get(self, key: str) -> bytes:
+        response = await run_blocking(self.s3.get_object, Bucket=self.bucket, Key=key)
+        return await run_blocking(response["Body"].read)
+
+    async def list_keys(self, prefix: str) -> list[str]:
+        response = await run_blocking(self.s3.list_objects_v2, Bucket=self.bucket, Prefix=prefix)
+        return [obj["Key"] for obj in response.get("Contents", [])]
+
+    def public_url(self, key: str) -> str:
+        return f"{self.public_base}/{key}"
+
+    def presign_upload(self, key: str, content_type: str, max_size: int, expires_in: int) -> dict:
+        """The policy pins the key, content type and ACL and caps the size, so
+        the bucket rejects anything the confirm step wouldn't accept.
+        Signing is local; no request is made.
+        """
+        return self.s3.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=key,
+            Fields={"acl": "public-read", "Content-Type": content_type},
+            Conditions=[
+                {"acl": "public-read"},
+                {"Content-Type": content_type},
+                ["content-length-range", 1, max_size],
+            ],
+            ExpiresIn=expires_in,
+        )
+
+    async def check(self):
+        await run_blocking(self.s3.head_bucket, Bucket=self.bucket)
+
+    async def _multipart_upload(self, file: UploadFile, key: str, content_type: str, first_chunk: bytes):
+        upload = await run_blocking(
+            self.s3.create_multipart_upload,
+            Bucket=self.bucket,
+            Key=key,
+            ContentType=content_type,
+            ACL='public-read'
+        )
+        upload_id = upload["UploadId"]
+        slots = asyncio.Semaphore(settings.STORAGE_UPLOAD_CONCURRENCY)
+        tasks = []
+
+        async def upload_part(part_number: int, body: bytes) -> dict:
+            try:
+                response = await run_blocking(
+                    self.s3.upload_part,
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=body
+                )
+                return {"PartNumber": part_number, "ETag": response["ETag"]}
+            finally:
+                slots.release()
+
+        try:
+            chunk = first_chunk
+            part_number = 1
+            while chunk:
+                # Waiting for a free slot is what keeps memory bounded
+                await slots.acquire()
+                for task in tasks:
+                    if task.done() and task.exception():
+                        raise task.exception()
+                tasks.append(asyncio.create_task(upload_part(part_number, chunk)))
+                part_number += 1
+                chunk = await file.read(settings.STORAGE_PART_SIZE)
+
+            parts = await asyncio.gather(*tasks)
+            await run_blocking(
+                self.s3.complete_multipart_upload,
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await run_blocking(self.s3.abort_multipart_upload, Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import mimetypes
+import os
+from typing import Optional
+from app.core.config import settings
+from app.core.executor import run_blocking, run_cpu
+from app.core.images import RASTER_TYPES, detect_type, make_variants
+from fastapi import UploadFile
+from .base import StorageBackend
+
+
+class StorageService:
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+
+    async def upload_file(self, file: UploadFile, folder: str, content_types: list[str], max_size: Optional[int] = None) -> str:
+        """Upload file to storage and return public URL"""
+        if file.content_type not in content_types:
+            raise ValueError(f"Unsupported content type {file.content_type}")
+        return self.public_url(await self._upload(file, folder, file.content_type, max_size))
+
+    async def upload_image(self, file: UploadFile, folder: str) -> dict:
+        """Upload a raster image plus its resized variants.
+
+        Returns {"url": ..., "variants": ...}; see `create_variants`.
+        """
+        data = await file.read(settings.STORAGE_MAX_IMAGE_SIZE + 1)
+        await file.seek(0)
+        if len(data) > settings.STORAGE_MAX_IMAGE_SIZE:
+            raise ValueError(f"File exceeds the maximum upload size of {settings.STORAGE_MAX_IMAGE_SIZE} bytes")
+        # The type comes from the bytes, not the client. Only rasters pass, so
+        # no SVG (which can carry script) is ever stored from this path
+        content_type = detect_type(data)
+        if content_type is None or content_type not in settings.STORAGE_IMAGE_TYPES:
+            raise ValueError("Unsupported image type")
+        key = await self._upload(file, folder, content_type, settings.STORAGE_MAX_IMAGE_SIZE)
+        return {"url": self.public_url(key), "variants": await self.create_variants(key, content_type, data)}
+
+    async def _upload(self, file: UploadFile, folder: str, content_type: str, max_size: Optional[int]) -> str:
+        """Stream an upload into storage and return its key.
+
+        Keys are content-addressed (see `content_key`): a first streaming pass
+        hashes the file, and if the object already exists the upload is
+        skipped, so retries and repeat uploads cost one HEAD.
+        """
+        # The stored type and the key's extension both come from the checked
+        # type, never the client's filename, so nothing is served as HTML
+        try:
+            digest = await run_blocking(self._hash_stream, file.file, max_size or settings.STORAGE_MAX_UPLOAD_SIZE)
+            file_name = content_key(folder, digest, content_type)
+            if await self.head(file_name) is not None:
+                return file_name
+
+            await file.seek(0)
+            await self.backend.put_file(file_name, file, content_type)
+            return file_name
+        except Exception as e:
+            print(f"Upload error details: {str(e)}")  # Add detailed error logging
+            raise ValueError(f"Failed to upload file: {str(e)}")
+        finally:
+            await file.seek(0)  # Reset file pointer for potential reuse
+
+    async def create_variants(self, key: str, content_type: Optional[str], data: Optional[bytes] = None) -> Optional[dict]:
+        """Generate and store resized WebP/AVIF copies next to an uploaded image.
+
+        Returns {format: {size: url}}, e.g. variants["webp"]["64"], or None
+        for non-raster images. Variants are an optimisation: on failure the
+        original is still usable, so errors are logged and None returned.
+        """
+        if content_type not in RASTER_TYPES:
+            return None
+        base = os.path.splitext(key)[0]
+        try:
+            existing = await self._existing_variants(base)
+            if existing is not None:
+                return existing
+            if data is None:
+                data = await self.backend.get(key)
+            variants = await run_cpu(
+                make_variants, data, settings.IMAGE_VARIANT_SIZES, settings.IMAGE_VARIANT_FORMATS
+            )
+            urls: dict[str, dict[str, str]] = {}
+
+            async def put(size: int, fmt: str, body: bytes):
+                variant_key = f"{base}/{size}.{fmt}"
+                await self.backend.put(
+                    variant_key, body, f"image/{fmt}", cache_control="public, max-age=31536000, immutable"
+                )
+                urls.setdefault(fmt, {})[str(size)] = self.public_url(variant_key)
+
+            await asyncio.gather(*(put(size, fmt, body) for size, fmt, body in variants))
+            # Written only once every variant is stored; see _existing_variants
+            await self.backend.put(_variants_marker(base), b"", "text/plain")
+            return urls
+        except Exception as e:
+            print(f"Image variant error for {key}: {e}")
+            return None
+
+    async def _existing_variants(self, base: str) -> Optional[dict]:
+        """Variants already stored under a content-addressed key, if complete"""
+        keys = await self.backend.list_keys(f"{base}/")
+        # No marker means an earlier attempt failed midway or used other
+        # settings; regenerate. Images smaller than every size have only the marker
+        marker = _variants_marker(base)
+        if marker not in keys:
+            return None
+        urls: dict[str, dict[str, str]] = {}
+        for key in keys:
+            if key == marker:
+                continue
+            size, _, fmt = key.rsplit("/", 1)[1].partition(".")
+            if fmt in settings.IMAGE_VARIANT_FORMATS and int(size) in settings.IMAGE_VARIANT_SIZES:
+                urls.setdefault(fmt, {})[size] = self.public_url(key)
+        return urls
+
+    def public_url(self, key: str) -> str:
+        return self.backend.public_url(key)
+
+    def presign_upload(self, key: str, content_type: str, max_size: int) -> dict:
+        """Presigned POST the browser can upload to directly.
+
+        Raises UnsupportedOperation on backends without direct uploads.
+        """
+        return self.backend.presign_upload(key, content_type, max_size, settings.STORAGE_PRESIGN_EXPIRES)
+
+    async def head(self, key: str) -> Optional[dict]:
+        """Object size and content type, or None if it doesn't exist"""
+        return await self.backend.head(key)
+
+    def _hash_stream(self, stream, max_size: int) -> str:
+        """SHA-256 of a file object read in parts, enforcing the size limit"""
+        hasher = hashlib.sha256()
+        total = 0
+        while chunk := stream.read(settings.STORAGE_PART_SIZE):
+            total += len(chunk)
+            if total > max_size:
+                raise ValueError(f"File exceeds the maximum upload size of {max_size} bytes")
+            hasher.update(chunk)
+        return hasher.hexdigest()
+
+def content_key(folder: str, digest: str, content_type: str) -> str:
+    """Object key derived from the content, with the extension of its type"""
+    extension = mimetypes.guess_extension(content_type) or ""
+    return f"{folder}/{digest}{extension}"
+
+
+def _variants_marker(base: str) -> str:
+    """Key recording that the variants for the current sizes and formats are complete"""
+    sizes = "-".join(str(size) for size in settings.IMAGE_VARIANT_SIZES)
+    return f"{base}/complete-{sizes}-{'-'.join(settings.IMAGE_VARIANT_FORMATS)}"
+
+
+def create_backend() -> StorageBackend:
+    """The backend selected by STORAGE_BACKEND"""
+    if settings.STORAGE_BACKEND == "local":
+        from .local import LocalBackend
+        return LocalBackend()
+    if settings.STORAGE_BACKEND == "s3":
+        from .s3 import S3Backend
+        return S3Backend()
+    raise ValueError(f"Unknown STORAGE_BACKEND {settings.STORAGE_BACKEND!r}")
+
+
+_storage_service: Optional[StorageService] = None
+
+
+def get_storage_service() -> StorageService:
+    """The worker's shared StorageService; backends are safe to share"""
+    global _storage_service
+    if _storage_service is None:
+        _storage_service = StorageService(create_backend())
+    return _storage_service
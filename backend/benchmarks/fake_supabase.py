@@ -0,0 +1,106 @@
+"""Minimal stand-in for the Supabase auth endpoints the API talks to.
+
+Issues HS256 access tokens signed with BENCH_JWT_SECRET (configure the API
+with the same SUPABASE_JWT_SECRET) and answers the calls made by token
+verification and the health monitor. User ids are derived from the email,
+so the server keeps no state and can be restarted between runs.
+
+    cd backend
+    BENCH_JWT_SECRET=secret BENCH_SUPABASE_URL=http://127.0.0.1:9998 \
+        python -m uvicorn benchmarks.fake_supabase:app --port 9998
+
+Started automatically by benchmarks.load_api.
+"""
+import os
+import time
+import uuid
+
+import jwt
+from fastapi import FastAPI, Header, HTTPException, Request
+
+SECRET = os.environ.get("BENCH_JWT_SECRET", "bench-secret-not-for-production-use")
+ISSUER = f"{os.environ.get('BENCH_SUPABASE_URL', 'http://127.0.0.1:9998').rstrip('/')}/auth/v1"
+AUDIENCE = "authenticated"
+TOKEN_TTL = 3600
+
+app = FastAPI()
+
+
+def user_id_for(email: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"bench:{email.lower()}"))
+
+
+def user_payload(user_id: str, email: str) -> dict:
+    return {
+        "id": user_id,
+        "aud": AUDIENCE,
+        "role": "authenticated",
+        "email": email,
+        "app_metadata": {"provider": "email"},
+        "user_metadata": {},
+        "created_at": "2025-01-01T00:00:00Z",
+    }
+
+
+def session_for(email: str) -> dict:
+    user_id = user_id_for(email)
+    now = int(time.time())
+    token = jwt.encode(
+        {
+            "sub": user_id,
+            "email": email,
+            "aud": AUDIENCE,
+            "iss": ISSUER,
+            "role": "authenticated",
+            "iat": now,
+            "exp": now + TOKEN_TTL,
+        },
+        SECRET,
+        algorithm="HS256",
+    )
+    return {
+        "access_token": token,
+        "token_type": "bearer",
+        "expires_in": TOKEN_TTL,
+        "refresh_token": uuid.uuid4().hex,
+        "user": user_payload(user_id, email),
+    }
+
+
+@app.post("/auth/v1/signup")
+async def signup(request: Request):
+    body = await request.json()
+    return session_for(body["email"])
+
+
+@app.post("/auth/v1/token")
+async def token(request: Request):
+    # Any password is accepted for grant_type=password
+    body = await request.json()
+    return session_for(body["email"])
+
+
+@app.get("/auth/v1/user")
+async def get_user(authorization: str = Header(...)):
+    try:
+        claims = jwt.decode(
+            authorization.removeprefix("Bearer "),
+            SECRET,
+            algorithms=["HS256"],
+            audience=AUDIENCE,
+            issuer=ISSUER,
+        )
+    except jwt.PyJWTError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    return user_payload(claims["sub"], claims["email"])
+
+
+@app.get("/auth/v1/.well-known/jwks.json")
+async def jwks():
+    # HS256 only; the API verifies with SUPABASE_JWT_SECRET
+    return {"keys": []}
+
+
+@app.get("/auth/v1/health")
+async def health():
+    return {"name": "GoTrue", "description": "benchmark stand-in"}